@@ -0,0 +1,72 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.settings import api_settings
+
+ASYNC_METHODS = ("GET", "HEAD")
+
+
+def run_authentication(request):
+    try:
+        for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+            result = authentication_class().authenticate(request)
+            if result is not None:
+                return result[0]
+    finally:
+        # Connections are per thread and request_finished only cleans up
+        # the request's own thread, so do it here for the pool thread.
+        close_old_connections()
+
+    return AnonymousUser()
+
+
+async def authenticate(request):
+    """
+    Run the configured DRF authentication classes for a plain Django
+    request. Returns the user, AnonymousUser when no credentials were
+    sent, and raises AuthenticationFailed for bad ones.
+
+    Runs on the default thread pool rather than the single thread that
+    sync_to_async shares by default, so concurrent requests do not
+    queue behind each other's token checks and user lookups.
+    """
+    return await sync_to_async(run_authentication, thread_sensitive=False)(request)
+
+
+def error_response(detail: str, status_code: int) -> JsonResponse:
+    return JsonResponse({"detail": detail}, status=status_code)
+
+
+def async_reads(async_view, sync_view, *, require_authentication: bool = True):
+    """
+    Serve GET/HEAD with `async_view(request, user, **kwargs)` and hand
+    every other method to the regular DRF view, so one URL keeps its
+    full behaviour while its hot read path never blocks a thread.
+    """
+
+    @csrf_exempt
+    @wraps(async_view)
+    async def view(request, *args, **kwargs):
+        if request.method not in ASYNC_METHODS:
+            return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+        try:
+            user = await authenticate(request)
+        except AuthenticationFailed as e:
+            return error_response(str(e.detail), status.HTTP_401_UNAUTHORIZED)
+
+        if require_authentication and not user.is_authenticated:
+            return error_response(
+                "Authentication credentials were not provided.",
+                status.HTTP_401_UNAUTHORIZED,
+            )
+
+        return await async_view(request, user, *args, **kwargs)
+
+    return view
@@ -6,3 +6,6 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 app = Celery("app")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
+
+# Task runtime, queue wait and retry metrics.
+from . import metrics  # noqa: E402,F401
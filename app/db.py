@@ -0,0 +1,74 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Wrappers of the request being served. A ContextVar follows the request
+# into sync_to_async threads, where the ORM of async views runs on
+# connections of that thread rather than the event loop's.
+_query_wrappers = ContextVar("query_wrappers", default=())
+
+
+def database_pool_stats() -> dict:
+    """
+    Connection settings of every configured database and, where the
+    psycopg3 native pool is in use, its live counters for this process.
+    """
+    stats = {}
+
+    for alias in connections:
+        config = settings.DATABASES[alias]
+        pool_options = config.get("OPTIONS", {}).get("pool")
+
+        alias_stats = {"conn_max_age": config.get("CONN_MAX_AGE", 0)}
+
+        if isinstance(pool_options, dict):
+            alias_stats["pool_min_size"] = pool_options.get("min_size", 4)
+            alias_stats["pool_max_size"] = pool_options.get("max_size")
+
+        # Read the pool registry directly: the `pool` property would
+        # create a pool that has not been used yet.
+        pools = getattr(type(connections[alias]), "_connection_pools", {})
+        if alias in pools:
+            alias_stats.update(pools[alias].get_stats())
+
+        stats[alias] = alias_stats
+
+    return stats
+
+
+def run_query_wrappers(execute, sql, params, many, context):
+    for wrapper in reversed(_query_wrappers.get()):
+        execute = partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_wrappers(connection):
+    # First in the list: connection.execute_wrapper() pops the last one.
+    if run_query_wrappers not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, run_query_wrappers)
+
+
+@receiver(connection_created)
+def install_on_connect(sender, connection, **kwargs):
+    install_query_wrappers(connection)
+
+
+@contextmanager
+def wrap_queries(wrapper):
+    """
+    Pass every query of the current context through `wrapper`, an
+    execute_wrapper, on whichever thread and connection it runs.
+    """
+    for connection in connections.all():
+        install_query_wrappers(connection)
+
+    token = _query_wrappers.set((*_query_wrappers.get(), wrapper))
+    try:
+        yield
+    finally:
+        _query_wrappers.reset(token)
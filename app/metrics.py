@@ -0,0 +1,282 @@
+import os
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from celery import signals
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from .db import wrap_queries
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent serving a request.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size.",
+    ["route"],
+    buckets=SIZE_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "http_db_queries",
+    "Database queries executed per request.",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_QUERY_TIME = Histogram(
+    "http_db_query_duration_seconds",
+    "Total database time per request.",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+OUTBOUND_LATENCY = Histogram(
+    "outbound_request_duration_seconds",
+    "Calls to external services.",
+    ["service", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+TASK_RUNTIME = Histogram(
+    "celery_task_runtime_seconds",
+    "Time a task spent executing.",
+    ["task", "state"],
+    buckets=TASK_BUCKETS,
+)
+TASK_QUEUE_WAIT = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Time between publishing a task and a worker starting it.",
+    ["task"],
+    buckets=TASK_BUCKETS,
+)
+TASK_RETRIES = Counter(
+    "celery_task_retries_total",
+    "Task retries requested.",
+    ["task"],
+)
+
+
+# ===============================
+# Registry
+# ===============================
+
+class ProcessStatsCollector:
+    """
+    Scrape-time gauges for state owned by the process that serves the
+    scrape: its password hashing jobs and database connections. They
+    carry a `pid` label because with several processes each scrape sees
+    only one of them; they are not service-wide totals.
+    """
+
+    def collect(self):
+        from app.db import database_pool_stats
+        from users.hashing import get_hashing_stats
+
+        pid = str(os.getpid())
+
+        hashing = GaugeMetricFamily(
+            "password_hashing_jobs",
+            "Password hashing jobs of the scraped process by state.",
+            labels=["pid", "state"],
+        )
+        for state, value in get_hashing_stats().items():
+            hashing.add_metric([pid, state], value)
+        yield hashing
+
+        database = GaugeMetricFamily(
+            "database_connection_setting",
+            "Connection pooling settings and live pool counters of the scraped process.",
+            labels=["pid", "alias", "name"],
+        )
+        for alias, stats in database_pool_stats().items():
+            for name, value in stats.items():
+                if isinstance(value, (int, float)):
+                    database.add_metric([pid, alias, name], value)
+        yield database
+
+
+_process_stats = ProcessStatsCollector()
+REGISTRY.register(_process_stats)
+
+
+def get_registry():
+    """
+    With PROMETHEUS_MULTIPROC_DIR set (gunicorn and prefork Celery
+    workers), aggregate the files every process writes there.
+    """
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(_process_stats)
+    return registry
+
+
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponseForbidden()
+
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+# ===============================
+# Requests
+# ===============================
+
+def route_of(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return match.route if match else "unmatched"
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """
+    Record latency, response size and database usage per route.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        queries = QueryCounter()
+        started = time.perf_counter()
+
+        with wrap_queries(queries):
+            response = self.get_response(request)
+
+        self.observe(request, response, queries, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        queries = QueryCounter()
+        started = time.perf_counter()
+
+        with wrap_queries(queries):
+            response = await self.get_response(request)
+
+        self.observe(request, response, queries, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def observe(request, response, queries, elapsed):
+        route = route_of(request)
+
+        REQUEST_LATENCY.labels(request.method, route, response.status_code).observe(elapsed)
+        DB_QUERIES.labels(route).observe(queries.count)
+        DB_QUERY_TIME.labels(route).observe(queries.duration)
+
+        if not response.streaming:
+            RESPONSE_SIZE.labels(route).observe(len(response.content))
+
+
+# ===============================
+# Outbound calls
+# ===============================
+
+@contextmanager
+def observe_outbound(service: str):
+    """
+    Time a call to an external service, labelled ok or error.
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        OUTBOUND_LATENCY.labels(service, outcome).observe(time.perf_counter() - started)
+
+
+# ===============================
+# Celery
+# ===============================
+
+_task_started = {}
+
+
+@signals.before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault("published_at", time.time())
+
+
+@signals.task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+    published_at = getattr(task.request, "published_at", None)
+    if published_at:
+        TASK_QUEUE_WAIT.labels(task.name).observe(max(0.0, time.time() - published_at))
+
+
+@signals.task_postrun.connect
+def record_task_runtime(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_RUNTIME.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+@signals.task_retry.connect
+def record_task_retry(sender=None, **kwargs):
+    TASK_RETRIES.labels(sender.name).inc()
+
+
+@signals.worker_init.connect
+def reset_multiprocess_dir(**kwargs):
+    # Runs in the main worker process before the pool forks: files left
+    # by a previous run would otherwise be summed into this one.
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name.endswith(".db"):
+                os.remove(os.path.join(path, name))
+
+
+@signals.worker_ready.connect
+def start_worker_metrics_server(**kwargs):
+    if settings.CELERY_METRICS_PORT:
+        from prometheus_client import start_http_server
+
+        start_http_server(settings.CELERY_METRICS_PORT, registry=get_registry())
@@ -0,0 +1,125 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .routers import (
+    ais_pinned_to_primary,
+    apin_to_primary,
+    is_pinned_to_primary,
+    pin_to_primary,
+    replica_configured,
+    use_replica,
+)
+
+
+NO_TOKEN = object()
+
+
+def token_user_id(request):
+    """
+    User id claim of the request's JWT: None for an invalid token and
+    NO_TOKEN when none was sent. Only decodes, so it is safe to call
+    from async code.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+
+    if raw_token is None:
+        return NO_TOKEN
+
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except InvalidToken:
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def request_user_id(request):
+    """
+    Id of the requesting user without touching the database: taken
+    from a valid JWT, or from the session user for the admin.
+    """
+    user_id = token_user_id(request)
+    if user_id is not NO_TOKEN:
+        return user_id
+
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+
+    return None
+
+
+async def arequest_user_id(request):
+    """
+    request_user_id for async middleware. The session user is loaded
+    with auser(), as request.user would query the database
+    synchronously.
+    """
+    user_id = token_user_id(request)
+    if user_id is not NO_TOKEN:
+        return user_id
+
+    if not hasattr(request, "auser"):
+        return None
+
+    user = await request.auser()
+    return user.pk if user.is_authenticated else None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve safe-method requests from the replica, unless the user wrote
+    something within REPLICA_STICKY_SECONDS. Successful writes pin the
+    user to the primary for that window.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        if not replica_configured():
+            return self.get_response(request)
+
+        user_id = request_user_id(request)
+
+        if request.method in SAFE_METHODS:
+            with use_replica(not (user_id and is_pinned_to_primary(user_id))):
+                return self.get_response(request)
+
+        response = self.get_response(request)
+
+        if user_id and response.status_code < 400:
+            pin_to_primary(user_id)
+
+        return response
+
+    async def __acall__(self, request):
+        if not replica_configured():
+            return await self.get_response(request)
+
+        user_id = await arequest_user_id(request)
+
+        if request.method in SAFE_METHODS:
+            pinned = bool(user_id) and await ais_pinned_to_primary(user_id)
+            with use_replica(not pinned):
+                return await self.get_response(request)
+
+        response = await self.get_response(request)
+
+        if user_id and response.status_code < 400:
+            await apin_to_primary(user_id)
+
+        return response
@@ -0,0 +1,304 @@
+import logging
+import random
+import re
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, transaction
+
+from .db import wrap_queries
+from .metrics import route_of
+from .middleware import request_user_id
+
+logger = logging.getLogger("app.slow_queries")
+
+PROFILE_HEADER = "X-Profile"
+
+# Keywords of statements that lock rows (FOR UPDATE, FOR SHARE) or write
+# (writable CTEs, SELECT INTO) even though they start with SELECT or WITH.
+# Those are never explained, so a slow one is not run a second time.
+NOT_READ_ONLY = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|INTO|SHARE)\b", re.IGNORECASE)
+
+
+def short_path(filename: str) -> str:
+    """
+    Project files relative to BASE_DIR, libraries from their package
+    directory, so frames read like `borrowings/views.py`.
+    """
+    path = Path(filename)
+    try:
+        return str(path.relative_to(settings.BASE_DIR))
+    except ValueError:
+        pass
+
+    parts = path.parts
+    if "site-packages" in parts:
+        return "/".join(parts[parts.index("site-packages") + 1:])
+    return path.name
+
+
+def is_app_file(filename: str) -> bool:
+    """
+    Code in the project's Django apps. manage.py and the `app` config
+    package only hold entry points, middleware and plumbing.
+    """
+    base = Path(settings.BASE_DIR)
+    path = Path(filename)
+    if not path.is_relative_to(base) or "site-packages" in path.parts:
+        return False
+
+    package = path.relative_to(base).parts
+    return len(package) > 1 and package[0] != "app"
+
+
+# ===============================
+# Sampling profiler
+# ===============================
+
+class StackSampler:
+    """
+    Sample one thread's Python stack every `interval` seconds from a
+    background thread and count identical stacks. The result is in the
+    collapsed format read by flamegraph.pl and speedscope.
+
+    Under ASGI the sampled thread is the event loop, which every request
+    in flight shares: the profile mixes their stacks, and ORM work that
+    runs in sync_to_async shows up only as time spent awaiting it. Read
+    ASGI profiles as a picture of the process, not of one request.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self.collapse(frame)] += 1
+
+    @staticmethod
+    def collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{short_path(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+def save_profile(request, stacks: Counter, elapsed: float) -> str:
+    """
+    Write collapsed stacks to PROFILING_DIR and return the file name.
+    """
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    route = route_of(request).strip("^$/").replace("/", "_") or "root"
+    route = "".join(c for c in route if c.isalnum() or c in "_-") or "route"
+    name = (
+        f"{time.strftime('%Y%m%dT%H%M%S')}-{request.method}-{route}-"
+        f"{elapsed * 1000:.0f}ms-{uuid.uuid4().hex[:6]}.folded"
+    )
+
+    with open(directory / name, "w", encoding="utf-8") as profile:
+        for stack, count in stacks.most_common():
+            profile.write(f"{stack} {count}\n")
+
+    return name
+
+
+# ===============================
+# Slow query log
+# ===============================
+
+class SlowQueryLogger:
+    """
+    execute_wrapper that logs statements slower than SLOW_QUERY_MS with
+    the request route, the app frames that issued them and, for
+    read-only statements, the EXPLAIN plan.
+    """
+
+    def __init__(self, request, threshold_ms: float):
+        self.request = request
+        self.threshold = threshold_ms / 1000
+        self._explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self._explaining:
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        elapsed = time.perf_counter() - started
+
+        if elapsed >= self.threshold:
+            plan = None if many else self.explain(context["connection"], sql, params)
+            logger.warning(
+                "Slow query %.1fms on %s %s\n  from: %s\n  sql: %s\n  plan:\n%s",
+                elapsed * 1000,
+                self.request.method,
+                route_of(self.request),
+                self.app_stack(),
+                sql,
+                plan or "    (not explained)",
+            )
+
+        return result
+
+    @staticmethod
+    def app_stack() -> str:
+        frames = [
+            f"{short_path(frame.filename)}:{frame.name}"
+            for frame in traceback.extract_stack()
+            if is_app_file(frame.filename)
+        ]
+        return " > ".join(frames) or "(no app frames)"
+
+    @staticmethod
+    def is_read_only(sql: str) -> bool:
+        return (
+            sql.lstrip().upper().startswith(("SELECT", "WITH"))
+            and not NOT_READ_ONLY.search(sql)
+        )
+
+    def explain(self, connection, sql: str, params) -> str | None:
+        if not settings.SLOW_QUERY_EXPLAIN or not self.is_read_only(sql):
+            return None
+
+        self._explaining = True
+        try:
+            # A savepoint keeps a failed EXPLAIN from breaking the
+            # request's transaction.
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+                rows = cursor.fetchall()
+        except DatabaseError as e:
+            return f"    (EXPLAIN failed: {e})"
+        finally:
+            self._explaining = False
+
+        return "\n".join(f"    {row[-1]}" for row in rows)
+
+
+# ===============================
+# Middleware
+# ===============================
+
+class ProfilingMiddleware:
+    """
+    With PROFILING_ENABLED, profile PROFILING_SAMPLE_RATE of requests
+    plus any request from a staff user sending `X-Profile: 1`; the
+    latter gets the profile file name back in the same header. With
+    SLOW_QUERY_MS set, log slow statements of every request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        requested = self.profile_requested(request)
+        if requested and not self.is_staff(request):
+            requested = False
+
+        with self.slow_query_log(request):
+            if not (requested or self.sampled()):
+                return self.get_response(request)
+
+            sampler, started = self.start_profile()
+            try:
+                response = self.get_response(request)
+            finally:
+                stacks = sampler.stop()
+
+        return self.finish_profile(request, response, stacks, started, requested)
+
+    async def __acall__(self, request):
+        requested = self.profile_requested(request)
+        if requested and not await sync_to_async(self.is_staff)(request):
+            requested = False
+
+        with self.slow_query_log(request):
+            if not (requested or self.sampled()):
+                return await self.get_response(request)
+
+            sampler, started = self.start_profile()
+            try:
+                response = await self.get_response(request)
+            finally:
+                stacks = sampler.stop()
+
+        return self.finish_profile(request, response, stacks, started, requested)
+
+    @staticmethod
+    def profile_requested(request) -> bool:
+        return settings.PROFILING_ENABLED and request.headers.get(PROFILE_HEADER) == "1"
+
+    @staticmethod
+    def sampled() -> bool:
+        return settings.PROFILING_ENABLED and random.random() < settings.PROFILING_SAMPLE_RATE
+
+    @staticmethod
+    def is_staff(request) -> bool:
+        from users.cache import get_cached_user
+
+        user_id = request_user_id(request)
+        if not user_id:
+            return False
+
+        try:
+            return get_cached_user(user_id).is_staff
+        except (get_user_model().DoesNotExist, ValueError):
+            return False
+
+    @staticmethod
+    @contextmanager
+    def slow_query_log(request):
+        if not settings.SLOW_QUERY_MS:
+            yield
+            return
+
+        with wrap_queries(SlowQueryLogger(request, settings.SLOW_QUERY_MS)):
+            yield
+
+    @staticmethod
+    def start_profile():
+        sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL)
+        sampler.start()
+        return sampler, time.perf_counter()
+
+    @staticmethod
+    def finish_profile(request, response, stacks, started, requested):
+        name = save_profile(request, stacks, time.perf_counter() - started)
+        if requested:
+            response[PROFILE_HEADER] = name
+        return response
@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA = "replica"
+
+_use_replica = ContextVar("use_replica", default=False)
+
+
+def replica_configured() -> bool:
+    return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def use_replica(enabled: bool = True):
+    """
+    Send ORM reads inside the block to the replica, when one is
+    configured. Writes always go to the primary.
+    """
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def _pin_key(user_id) -> str:
+    return f"db:pin-primary:{user_id}"
+
+
+def pin_to_primary(user_id) -> None:
+    """
+    Serve this user's reads from the primary for REPLICA_STICKY_SECONDS,
+    so they see their own write despite replication lag.
+    """
+    cache.set(_pin_key(user_id), True, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned_to_primary(user_id) -> bool:
+    return bool(cache.get(_pin_key(user_id)))
+
+
+async def apin_to_primary(user_id) -> None:
+    await cache.aset(_pin_key(user_id), True, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+async def ais_pinned_to_primary(user_id) -> bool:
+    return bool(await cache.aget(_pin_key(user_id)))
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and replica_configured():
+            return REPLICA
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
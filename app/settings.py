@@ -57,16 +57,21 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'app.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'app.middleware.ReplicaRoutingMiddleware',
+    'app.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'app.urls'
+# app.asgi switches this to app.urls_asgi, which serves the hot read
+# endpoints with async views.
+ROOT_URLCONF = os.getenv("DJANGO_ROOT_URLCONF", "app.urls")
 
 TEMPLATES = [
     {
@@ -100,6 +105,44 @@ if os.getenv("POSTGRES_DB"):
             "PORT": os.getenv("POSTGRES_PORT", "5432"),
         }
     }
+
+    # persistent: keep one connection per process/thread for
+    #   DB_CONN_MAX_AGE seconds, checked before reuse.
+    # native: psycopg3 connection pool shared by the threads of a process.
+    # pgbouncer: short-lived connections to PgBouncer in transaction mode,
+    #   without server-side cursors or prepared statements.
+    DB_POOL_MODE = os.getenv("DB_POOL_MODE", "persistent")
+    DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+    database = DATABASES["default"]
+    database["CONN_HEALTH_CHECKS"] = True
+
+    if DB_POOL_MODE == "native":
+        database["CONN_MAX_AGE"] = 0
+        database["OPTIONS"] = {
+            "pool": {
+                "min_size": DB_POOL_MIN_SIZE,
+                "max_size": DB_POOL_MAX_SIZE,
+                "timeout": DB_POOL_TIMEOUT,
+            },
+        }
+    elif DB_POOL_MODE == "pgbouncer":
+        database["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "0"))
+        # Django already leaves psycopg3 prepared statements off.
+        database["DISABLE_SERVER_SIDE_CURSORS"] = True
+    else:
+        database["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+
+    # Optional streaming replica for safe-method requests and reports.
+    if os.getenv("POSTGRES_REPLICA_HOST"):
+        DATABASES["replica"] = {
+            **database,
+            "HOST": os.getenv("POSTGRES_REPLICA_HOST"),
+            "PORT": os.getenv("POSTGRES_REPLICA_PORT", database["PORT"]),
+            "TEST": {"MIRROR": "default"},
+        }
 else:
     DATABASES = {
         "default": {
@@ -108,6 +151,21 @@ else:
         }
     }
 
+DATABASE_ROUTERS = ["app.routers.PrimaryReplicaRouter"]
+
+# How long a user's reads stay on the primary after they write.
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+# Shared by all web and worker processes when CACHE_REDIS_URL is set;
+# process-local otherwise.
+if os.getenv("CACHE_REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("CACHE_REDIS_URL"),
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -128,6 +186,29 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# The first hasher is used for new hashes; logins with an older one
+# are rehashed transparently. argon2 needs argon2-cffi.
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if os.getenv("PASSWORD_HASHER", "pbkdf2") == "argon2":
+    PASSWORD_HASHERS.remove("django.contrib.auth.hashers.Argon2PasswordHasher")
+    PASSWORD_HASHERS.insert(0, "django.contrib.auth.hashers.Argon2PasswordHasher")
+
+# At most PASSWORD_HASHING_MAX_CONCURRENT hashes run at once across all
+# processes sharing PASSWORD_HASHING_REDIS_URL (per process without it).
+# A request that gets no slot within PASSWORD_HASHING_MAX_WAIT seconds
+# gets 503; slots of a crashed process expire after the lease.
+PASSWORD_HASHING_REDIS_URL = os.getenv("PASSWORD_HASHING_REDIS_URL")
+PASSWORD_HASHING_MAX_CONCURRENT = int(os.getenv("PASSWORD_HASHING_MAX_CONCURRENT", "4"))
+PASSWORD_HASHING_MAX_WAIT = float(os.getenv("PASSWORD_HASHING_MAX_WAIT", "1"))
+PASSWORD_HASHING_LEASE = float(os.getenv("PASSWORD_HASHING_LEASE", "30"))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -147,7 +228,7 @@ STATIC_URL = 'static/'
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -168,13 +249,26 @@ SPECTACULAR_SETTINGS = {
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Serve safe-method requests from is_staff/is_active token claims,
+# without loading the user. The short access lifetime bounds how long
+# a revoked staff flag or deactivation can go unnoticed.
+JWT_STATELESS_AUTH = os.getenv("JWT_STATELESS_AUTH", "False") == "True"
+
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5 if JWT_STATELESS_AUTH else 30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_TYPES": ("Authorize",),
     "USER_ID_FIELD": "id",
     "USER_ID_CLAIM": "user_id",
 }
+
+# Authenticated users are resolved through a short-lived per-process
+# LRU, then Redis (when configured), then the database.
+USER_CACHE_LOCAL_TTL = float(os.getenv("USER_CACHE_LOCAL_TTL", "5"))
+USER_CACHE_LOCAL_SIZE = int(os.getenv("USER_CACHE_LOCAL_SIZE", "1024"))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))
+USER_CACHE_REDIS_URL = os.getenv("USER_CACHE_REDIS_URL")
+
 AUTHENTICATION_BACKENDS = [
     "django.contrib.auth.backends.ModelBackend",
 ]
@@ -184,10 +278,67 @@ STRIPE_SUCCESS_URL = os.getenv("STRIPE_SUCCESS_URL")
 STRIPE_CANCEL_URL = os.getenv("STRIPE_CANCEL_URL")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
 
+PAYMENT_SESSION_TTL = timedelta(hours=24)
+PAYMENT_EXPIRY_BATCH_SIZE = int(os.getenv("PAYMENT_EXPIRY_BATCH_SIZE", "1000"))
+
+EMAIL_BACKEND = os.getenv(
+    "EMAIL_BACKEND",
+    "django.core.mail.backends.console.EmailBackend",
+)
+EMAIL_HOST = os.getenv("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", "25"))
+EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "False") == "True"
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "library@localhost")
+
 FINE_MULTIPLIER = 2
+ACCRUED_FINE_CHUNK_SIZE = int(os.getenv("ACCRUED_FINE_CHUNK_SIZE", "5000"))
+
+# telegram, file, memory, noop or a dotted path to a backend class.
+NOTIFICATION_BACKEND = os.getenv("NOTIFICATION_BACKEND", "telegram")
+NOTIFICATION_FILE_PATH = os.getenv("NOTIFICATION_FILE_PATH", str(BASE_DIR / "notifications.ndjson"))
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+TELEGRAM_TIMEOUT = 10
+TELEGRAM_POOL_MAXSIZE = int(os.getenv("TELEGRAM_POOL_MAXSIZE", "10"))
+TELEGRAM_ASYNC_CONCURRENCY = int(os.getenv("TELEGRAM_ASYNC_CONCURRENCY", "20"))
+
+# Shared token buckets for outbound bot API calls (messages per second).
+TELEGRAM_RATE_LIMIT_ENABLED = os.getenv("TELEGRAM_RATE_LIMIT_ENABLED", "True") == "True"
+TELEGRAM_RATE_LIMIT_REDIS_URL = os.getenv(
+    "TELEGRAM_RATE_LIMIT_REDIS_URL",
+    os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0"),
+)
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+TELEGRAM_GLOBAL_BURST = int(os.getenv("TELEGRAM_GLOBAL_BURST", "30"))
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+TELEGRAM_CHAT_BURST = int(os.getenv("TELEGRAM_CHAT_BURST", "3"))
+TELEGRAM_RATE_LIMIT_MAX_WAIT = float(os.getenv("TELEGRAM_RATE_LIMIT_MAX_WAIT", "5"))
+
+# Digest mode: buffer notifications and merge them into as few
+# messages as possible. Intervals are in seconds.
+TELEGRAM_DIGEST_ENABLED = os.getenv("TELEGRAM_DIGEST_ENABLED", "False") == "True"
+TELEGRAM_DIGEST_FLUSH_INTERVAL = int(os.getenv("TELEGRAM_DIGEST_FLUSH_INTERVAL", "30"))
+TELEGRAM_DIGEST_MAX_LATENCY = int(os.getenv("TELEGRAM_DIGEST_MAX_LATENCY", "120"))
+TELEGRAM_DIGEST_BATCH_SIZE = int(os.getenv("TELEGRAM_DIGEST_BATCH_SIZE", "500"))
+
+NOTIFICATION_OUTBOX_BATCH_SIZE = int(os.getenv("NOTIFICATION_OUTBOX_BATCH_SIZE", "500"))
+NOTIFICATION_OUTBOX_POLL_INTERVAL = float(os.getenv("NOTIFICATION_OUTBOX_POLL_INTERVAL", "1"))
+
+NOTIFICATION_DELIVERY_TTL = timedelta(days=7)
+# An unfinished delivery claim older than this (seconds) is treated as
+# abandoned by a dead worker and may be taken over.
+NOTIFICATION_CLAIM_TIMEOUT = int(os.getenv("NOTIFICATION_CLAIM_TIMEOUT", "300"))
+
+REMINDER_DAYS_BEFORE = int(os.getenv("REMINDER_DAYS_BEFORE", "2"))
+REMINDER_PAGE_SIZE = int(os.getenv("REMINDER_PAGE_SIZE", "10000"))
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "500"))
+
+OVERDUE_SCAN_CHUNK_SIZE = int(os.getenv("OVERDUE_SCAN_CHUNK_SIZE", "2000"))
+OVERDUE_WEEKLY_SUMMARY = os.getenv("OVERDUE_WEEKLY_SUMMARY", "True") == "True"
 
 CELERY_BROKER_URL = os.getenv(
     "CELERY_BROKER_URL",
@@ -199,9 +350,92 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 
+# Workloads get their own queues (and worker profiles in docker-compose),
+# so a Telegram backlog never delays payment or maintenance work.
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_ROUTES = {
+    "notifications.tasks.notify*": {"queue": "notifications"},
+    "notifications.tasks.flush_notification_digest": {"queue": "notifications"},
+    "notifications.tasks.send_reminder_batch": {"queue": "notifications"},
+    "payments.tasks.expire_stale_payments": {"queue": "payments"},
+    "payments.tasks.refresh_payment_summaries": {"queue": "batch"},
+    "borrowings.tasks.*": {"queue": "batch"},
+    "notifications.tasks.check_overdue_borrowings": {"queue": "batch"},
+    "notifications.tasks.detect_new_overdue_borrowings": {"queue": "batch"},
+    "notifications.tasks.schedule_due_reminders": {"queue": "batch"},
+    "notifications.tasks.purge_notification_deliveries": {"queue": "batch"},
+}
+
+# Late acks (requeue when the worker dies mid-task) are set per task,
+# with acks_late=True on the decorator, only where a redelivery cannot
+# repeat user-visible work: ledger-backed notifications and reminders,
+# the digest flush and the rebuildable batch jobs. notify and the
+# overdue reports keep early acks.
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.getenv("CELERY_WORKER_PREFETCH_MULTIPLIER", "1"))
+
+# Nothing reads task results; skip the result-backend writes.
+CELERY_TASK_IGNORE_RESULT = True
+
+CELERY_TASK_SOFT_TIME_LIMIT = int(os.getenv("CELERY_TASK_SOFT_TIME_LIMIT", "300"))
+CELERY_TASK_TIME_LIMIT = int(os.getenv("CELERY_TASK_TIME_LIMIT", "360"))
+
+# Unacknowledged messages are redelivered after this long; keep it
+# above the longest batch time limit so late-acked tasks are never
+# redelivered while still running.
+CELERY_BROKER_TRANSPORT_OPTIONS = {"visibility_timeout": 2 * 60 * 60}
+
 CELERY_BEAT_SCHEDULE = {
-    "check-overdue-borrowings-daily": {
-        "task": "notifications.tasks.check_overdue_borrowings",
-        "schedule": crontab(hour=9, minute=0),
+    "detect-new-overdue-borrowings-hourly": {
+        "task": "notifications.tasks.detect_new_overdue_borrowings",
+        "schedule": crontab(minute=0),
+    },
+    "expire-stale-payments-hourly": {
+        "task": "payments.tasks.expire_stale_payments",
+        "schedule": crontab(minute=15),
+    },
+    "compute-accrued-fines-nightly": {
+        "task": "borrowings.tasks.compute_accrued_fines",
+        "schedule": crontab(hour=1, minute=0),
+    },
+    "flush-notification-digest": {
+        "task": "notifications.tasks.flush_notification_digest",
+        "schedule": timedelta(seconds=TELEGRAM_DIGEST_FLUSH_INTERVAL),
+    },
+    "schedule-due-reminders-daily": {
+        "task": "notifications.tasks.schedule_due_reminders",
+        "schedule": crontab(hour=8, minute=0),
+    },
+    "purge-notification-deliveries-daily": {
+        "task": "notifications.tasks.purge_notification_deliveries",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "refresh-payment-summaries": {
+        "task": "payments.tasks.refresh_payment_summaries",
+        "schedule": crontab(minute="*/15"),
     },
 }
+
+if OVERDUE_WEEKLY_SUMMARY:
+    CELERY_BEAT_SCHEDULE["check-overdue-borrowings-weekly"] = {
+        "task": "notifications.tasks.check_overdue_borrowings",
+        "schedule": crontab(hour=9, minute=0, day_of_week="mon"),
+    }
+
+# Prometheus metrics. /metrics requires "Authorization: Bearer <token>"
+# when METRICS_TOKEN is set; Celery workers serve their own metrics on
+# CELERY_METRICS_PORT.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+CELERY_METRICS_PORT = int(os.getenv("CELERY_METRICS_PORT", "0"))
+
+# Request profiling. Sampled requests, and staff requests sending
+# "X-Profile: 1", are written to PROFILING_DIR as collapsed stacks
+# (flamegraph.pl / speedscope).
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False") == "True"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL_MS", "5")) / 1000
+PROFILING_DIR = os.getenv("PROFILING_DIR", "/tmp/profiles")
+
+# Log SQL slower than this many ms (0 disables) to "app.slow_queries",
+# with the EXPLAIN plan of reads.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "True") == "True"
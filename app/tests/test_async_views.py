@@ -0,0 +1,116 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from borrowings.models import Borrowing
+from payments.models import Payment
+
+User = get_user_model()
+
+
+class AsyncReadEndpointTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="user@example.com", password="x")
+        self.other = User.objects.create_user(email="other@example.com", password="x")
+        self.book = Book.objects.create(
+            title="Clean Code",
+            author="Robert C. Martin",
+            cover=Book.CoverType.SOFT,
+            inventory=3,
+            daily_fee=Decimal("10.00"),
+        )
+        self.borrowing = Borrowing.objects.create(
+            user=self.user,
+            book=self.book,
+            expected_return_date="2030-01-01",
+        )
+        Borrowing.objects.create(
+            user=self.other,
+            book=self.book,
+            expected_return_date="2030-01-01",
+        )
+        self.payment = Payment.objects.create(
+            borrowing=self.borrowing,
+            type=Payment.Type.PAYMENT,
+            status=Payment.Status.PENDING,
+            money_to_pay=Decimal("10.00"),
+        )
+
+    def authorize(self, user):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Authorize {AccessToken.for_user(user)}"
+        )
+
+    def get_both(self, url):
+        """
+        Fetch `url` from the regular DRF views and from the ASGI URLconf.
+        """
+        sync_response = self.client.get(url)
+        with override_settings(ROOT_URLCONF="app.urls_asgi"):
+            async_response = self.client.get(url)
+        return sync_response, async_response
+
+    # ===============================
+    # Books
+    # ===============================
+
+    def test_book_list_matches_sync_view(self):
+        sync_response, async_response = self.get_both("/api/books/")
+
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_response.json(), sync_response.json())
+
+    def test_book_detail_matches_sync_view(self):
+        sync_response, async_response = self.get_both(f"/api/books/{self.book.id}/")
+
+        self.assertEqual(async_response.json(), sync_response.json())
+
+    def test_missing_book_is_404(self):
+        _, async_response = self.get_both("/api/books/999/")
+
+        self.assertEqual(async_response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(ROOT_URLCONF="app.urls_asgi")
+    def test_writes_still_go_through_drf(self):
+        response = self.client.post("/api/books/", {"title": "New"})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    # ===============================
+    # Borrowings and payments
+    # ===============================
+
+    def test_borrowing_list_shows_only_own(self):
+        self.authorize(self.user)
+
+        sync_response, async_response = self.get_both("/api/borrowings/")
+
+        self.assertEqual(async_response.json(), sync_response.json())
+        self.assertEqual(len(async_response.json()), 1)
+
+    @override_settings(ROOT_URLCONF="app.urls_asgi")
+    def test_borrowing_list_requires_authentication(self):
+        response = self.client.get("/api/borrowings/")
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_payment_status_matches_sync_view(self):
+        self.authorize(self.user)
+
+        sync_response, async_response = self.get_both(f"/api/payments/{self.payment.id}/")
+
+        self.assertEqual(async_response.json(), sync_response.json())
+        self.assertEqual(async_response.json()["status"], Payment.Status.PENDING)
+
+    def test_payment_of_other_user_is_404(self):
+        self.authorize(self.other)
+
+        _, async_response = self.get_both(f"/api/payments/{self.payment.id}/")
+
+        self.assertEqual(async_response.status_code, status.HTTP_404_NOT_FOUND)
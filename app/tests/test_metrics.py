@@ -0,0 +1,158 @@
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+
+from app import metrics
+from books.models import Book
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsMiddlewareTests(TestCase):
+
+    def setUp(self):
+        Book.objects.create(
+            title="Dune",
+            author="Frank Herbert",
+            cover="HARD",
+            inventory=3,
+            daily_fee="1.50",
+        )
+
+    def test_request_is_recorded_under_its_route(self):
+        route = "api/books/$"
+        before = sample(
+            "http_request_duration_seconds_count",
+            method="GET", route=route, status="200",
+        )
+        queries_before = sample("http_db_queries_sum", route=route)
+
+        response = self.client.get("/api/books/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sample(
+                "http_request_duration_seconds_count",
+                method="GET", route=route, status="200",
+            ),
+            before + 1,
+        )
+        self.assertGreater(sample("http_db_queries_sum", route=route), queries_before)
+        self.assertGreater(sample("http_response_size_bytes_sum", route=route), 0)
+
+    @override_settings(ROOT_URLCONF="app.urls_asgi")
+    async def test_async_view_queries_are_counted(self):
+        # The async view's ORM calls run in a sync_to_async thread, not
+        # on the event loop thread the middleware runs on.
+        route = "api/books/"
+        count_before = sample("http_db_queries_count", route=route)
+        queries_before = sample("http_db_queries_sum", route=route)
+
+        response = await self.async_client.get("/api/books/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sample("http_db_queries_count", route=route), count_before + 1)
+        self.assertGreater(sample("http_db_queries_sum", route=route), queries_before)
+
+    def test_unresolved_path_uses_one_label(self):
+        before = sample(
+            "http_request_duration_seconds_count",
+            method="GET", route="unmatched", status="404",
+        )
+
+        self.client.get("/no/such/page/")
+
+        self.assertEqual(
+            sample(
+                "http_request_duration_seconds_count",
+                method="GET", route="unmatched", status="404",
+            ),
+            before + 1,
+        )
+
+    # ===============================
+    # /metrics
+    # ===============================
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_metrics_endpoint_exposes_prometheus_text(self):
+        self.client.get("/api/books/")
+
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"http_request_duration_seconds_bucket", response.content)
+        self.assertIn(
+            f'password_hashing_jobs{{pid="{os.getpid()}",state="queued"}}'.encode(),
+            response.content,
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_endpoint_requires_token_when_configured(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+        response = self.client.get(
+            "/metrics", headers={"Authorization": "Bearer secret"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class OutboundAndTaskMetricsTests(TestCase):
+
+    def test_outbound_call_is_labelled_by_outcome(self):
+        ok = sample("outbound_request_duration_seconds_count", service="test", outcome="ok")
+        error = sample("outbound_request_duration_seconds_count", service="test", outcome="error")
+
+        with metrics.observe_outbound("test"):
+            pass
+        with self.assertRaises(RuntimeError):
+            with metrics.observe_outbound("test"):
+                raise RuntimeError
+
+        self.assertEqual(
+            sample("outbound_request_duration_seconds_count", service="test", outcome="ok"),
+            ok + 1,
+        )
+        self.assertEqual(
+            sample("outbound_request_duration_seconds_count", service="test", outcome="error"),
+            error + 1,
+        )
+
+    @patch("notifications.transport.get_session")
+    def test_telegram_send_is_timed(self, get_session):
+        from notifications.transport import post_message
+
+        before = sample(
+            "outbound_request_duration_seconds_count", service="telegram", outcome="ok"
+        )
+
+        post_message("hello")
+
+        self.assertEqual(
+            sample("outbound_request_duration_seconds_count", service="telegram", outcome="ok"),
+            before + 1,
+        )
+
+    def test_task_signals_record_wait_runtime_and_retries(self):
+        task = SimpleNamespace(
+            name="tests.task",
+            request=SimpleNamespace(published_at=0),
+        )
+        headers = {}
+
+        metrics.stamp_published_at(headers=headers)
+        task.request.published_at = headers["published_at"]
+        metrics.record_task_start(task_id="1", task=task)
+        metrics.record_task_runtime(task_id="1", task=task, state="SUCCESS")
+        metrics.record_task_retry(sender=task)
+
+        self.assertEqual(sample("celery_task_queue_wait_seconds_count", task="tests.task"), 1)
+        self.assertEqual(
+            sample("celery_task_runtime_seconds_count", task="tests.task", state="SUCCESS"), 1
+        )
+        self.assertEqual(sample("celery_task_retries_total", task="tests.task"), 1)
@@ -0,0 +1,170 @@
+import shutil
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from app.profiling import PROFILE_HEADER, SlowQueryLogger, StackSampler
+from books.models import Book
+from users.cache import clear_local_cache
+from users.models import User
+
+
+class ProfilingMiddlewareTests(APITestCase):
+
+    def setUp(self):
+        clear_local_cache()
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir, ignore_errors=True)
+
+        self.user = User.objects.create_user(
+            email="user@test.com",
+            password="password123",
+        )
+        self.staff = User.objects.create_user(
+            email="staff@test.com",
+            password="password123",
+            is_staff=True,
+        )
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Author",
+            cover="HARD",
+            inventory=5,
+            daily_fee=Decimal("10.00"),
+        )
+
+    def authorize(self, user):
+        token = AccessToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Authorize {token}")
+
+    def profiles(self):
+        return list(Path(self.profile_dir).glob("*.folded"))
+
+    # ===============================
+    # Profiler
+    # ===============================
+
+    def test_staff_header_profiles_request(self):
+        self.authorize(self.staff)
+
+        with self.settings(PROFILING_ENABLED=True, PROFILING_DIR=self.profile_dir):
+            response = self.client.get("/api/books/", headers={PROFILE_HEADER: "1"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [profile.name for profile in self.profiles()],
+            [response[PROFILE_HEADER]],
+        )
+        self.assertIn("-GET-api_books-", response[PROFILE_HEADER])
+
+    def test_header_is_ignored_for_non_staff(self):
+        self.authorize(self.user)
+
+        with self.settings(PROFILING_ENABLED=True, PROFILING_DIR=self.profile_dir):
+            response = self.client.get("/api/books/", headers={PROFILE_HEADER: "1"})
+
+        self.assertNotIn(PROFILE_HEADER, response)
+        self.assertEqual(self.profiles(), [])
+
+    def test_header_is_ignored_when_disabled(self):
+        self.authorize(self.staff)
+
+        with self.settings(PROFILING_ENABLED=False, PROFILING_DIR=self.profile_dir):
+            self.client.get("/api/books/", headers={PROFILE_HEADER: "1"})
+
+        self.assertEqual(self.profiles(), [])
+
+    def test_sampled_request_is_profiled_silently(self):
+        with self.settings(
+            PROFILING_ENABLED=True,
+            PROFILING_SAMPLE_RATE=1,
+            PROFILING_DIR=self.profile_dir,
+        ):
+            response = self.client.get("/api/books/")
+
+        self.assertNotIn(PROFILE_HEADER, response)
+        self.assertEqual(len(self.profiles()), 1)
+
+    def test_sampler_writes_collapsed_stacks(self):
+        sampler = StackSampler(threading.get_ident(), interval=0.001)
+        sampler.start()
+        deadline = time.monotonic() + 0.05
+        while time.monotonic() < deadline:
+            pass
+        stacks = sampler.stop()
+
+        self.assertTrue(stacks)
+        frame = "app/tests/test_profiling.py:test_sampler_writes_collapsed_stacks"
+        self.assertTrue(any(frame in stack for stack in stacks))
+
+    # ===============================
+    # Slow query log
+    # ===============================
+
+    @override_settings(
+        SLOW_QUERY_MS=0.000001,
+        STRIPE_SUCCESS_URL="http://test/success/",
+        STRIPE_CANCEL_URL="http://test/cancel/",
+    )
+    @patch("borrowings.views.create_checkout_session")
+    def test_slow_query_is_logged_with_route_stack_and_plan(self, create_checkout_session):
+        create_checkout_session.return_value = MagicMock(id="sess_1", url="http://stripe.test")
+        self.client.force_authenticate(self.user)
+
+        with self.assertLogs("app.slow_queries", level="WARNING") as logs:
+            response = self.client.post(
+                reverse("borrowings-list"),
+                {"book": self.book.id, "expected_return_date": "2030-01-01"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 201)
+
+        select_book = next(
+            line for line in logs.output
+            if "borrowings/views.py:perform_create" in line and '"books_book"' in line
+        )
+        self.assertIn("POST api/borrowings/$", select_book)
+        self.assertIn("plan:", select_book)
+        self.assertNotIn("(not explained)", select_book)
+
+    def test_fast_queries_are_not_logged(self):
+        with self.assertNoLogs("app.slow_queries"):
+            self.client.get("/api/books/")
+
+    @override_settings(SLOW_QUERY_MS=0.000001, ROOT_URLCONF="app.urls_asgi")
+    async def test_slow_query_of_async_view_is_logged(self):
+        with self.assertLogs("app.slow_queries", level="WARNING") as logs:
+            response = await self.async_client.get("/api/books/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(any(
+            "GET api/books/" in line and '"books_book"' in line
+            for line in logs.output
+        ))
+
+    def test_only_read_only_statements_are_explained(self):
+        self.assertTrue(SlowQueryLogger.is_read_only('SELECT "id" FROM "books_book"'))
+        self.assertTrue(SlowQueryLogger.is_read_only(
+            'WITH t AS (SELECT "updated_at" FROM "x") SELECT * FROM t'
+        ))
+
+        for sql in (
+            'SELECT "id" FROM "books_book" WHERE "id" = 1 FOR UPDATE',
+            'SELECT "id" FROM "books_book" FOR NO KEY UPDATE SKIP LOCKED',
+            'SELECT "id" FROM "books_book" FOR SHARE',
+            'WITH moved AS (DELETE FROM "x" RETURNING *) SELECT * FROM moved',
+            'WITH t AS (UPDATE "x" SET "a" = 1 RETURNING *) SELECT * FROM t',
+            'SELECT * INTO "copy" FROM "books_book"',
+            'UPDATE "books_book" SET "inventory" = 1',
+        ):
+            with self.subTest(sql=sql):
+                self.assertFalse(SlowQueryLogger.is_read_only(sql))
@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import SimpleTestCase, override_settings
+from django.test.client import AsyncRequestFactory, RequestFactory
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.tokens import AccessToken
+
+from app.middleware import ReplicaRoutingMiddleware
+from app.routers import PrimaryReplicaRouter, use_replica
+from books.models import Book
+
+
+@override_settings(REPLICA_STICKY_SECONDS=10)
+@patch("app.routers.replica_configured", return_value=True)
+@patch("app.middleware.replica_configured", return_value=True)
+class ReplicaRoutingTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        self.routed_to = []
+
+        def view(request):
+            self.routed_to.append(self.router.db_for_read(Book))
+            return HttpResponse(status=201 if request.method == "POST" else 200)
+
+        self.middleware = ReplicaRoutingMiddleware(view)
+
+    def auth_header(self, user_id):
+        token = AccessToken()
+        token["user_id"] = str(user_id)
+        return {"HTTP_AUTHORIZATION": f"Authorize {token}"}
+
+    # ===============================
+    # Router
+    # ===============================
+
+    def test_reads_go_to_primary_by_default(self, *mocks):
+        self.assertEqual(self.router.db_for_read(Book), "default")
+
+    def test_reads_go_to_replica_inside_use_replica(self, *mocks):
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(Book), "replica")
+            self.assertEqual(self.router.db_for_write(Book), "default")
+
+    def test_migrations_only_run_on_primary(self, *mocks):
+        self.assertTrue(self.router.allow_migrate("default", "books"))
+        self.assertFalse(self.router.allow_migrate("replica", "books"))
+
+    # ===============================
+    # Middleware
+    # ===============================
+
+    def test_safe_request_reads_from_replica(self, *mocks):
+        self.middleware(self.factory.get("/api/books/"))
+
+        self.assertEqual(self.routed_to, ["replica"])
+
+    def test_write_pins_user_to_primary(self, *mocks):
+        self.middleware(self.factory.post("/api/borrowings/", **self.auth_header(1)))
+        self.middleware(self.factory.get("/api/borrowings/", **self.auth_header(1)))
+        self.middleware(self.factory.get("/api/borrowings/", **self.auth_header(2)))
+
+        self.assertEqual(self.routed_to, ["default", "default", "replica"])
+
+    def test_failed_write_does_not_pin(self, *mocks):
+        self.middleware = ReplicaRoutingMiddleware(lambda request: HttpResponse(status=400))
+        self.middleware(self.factory.post("/api/borrowings/", **self.auth_header(1)))
+
+        self.middleware = ReplicaRoutingMiddleware(
+            lambda request: self.routed_to.append(self.router.db_for_read(Book)) or HttpResponse()
+        )
+        self.middleware(self.factory.get("/api/borrowings/", **self.auth_header(1)))
+
+        self.assertEqual(self.routed_to, ["replica"])
+
+    async def test_async_requests_follow_the_same_rules(self, *mocks):
+        factory = AsyncRequestFactory()
+
+        async def view(request):
+            self.routed_to.append(self.router.db_for_read(Book))
+            return HttpResponse(status=201 if request.method == "POST" else 200)
+
+        middleware = ReplicaRoutingMiddleware(view)
+        headers = {"Authorization": self.auth_header(1)["HTTP_AUTHORIZATION"]}
+
+        await middleware(factory.get("/api/books/", headers=headers))
+        await middleware(factory.post("/api/borrowings/", headers=headers))
+        await middleware(factory.get("/api/borrowings/", headers=headers))
+
+        self.assertEqual(self.routed_to, ["replica", "default", "default"])
+
+    async def test_async_session_user_is_loaded_without_sync_queries(self, *mocks):
+        factory = AsyncRequestFactory()
+        request = factory.get("/admin/")
+        user = SimpleNamespace(pk=7, is_authenticated=True)
+
+        async def auser():
+            return user
+
+        # Touching request.user from async code would raise
+        # SynchronousOnlyOperation on a real session.
+        request.user = SimpleLazyObject(lambda: self.fail("request.user was evaluated"))
+        request.auser = auser
+
+        async def view(request):
+            self.routed_to.append(self.router.db_for_read(Book))
+            return HttpResponse()
+
+        with patch("app.middleware.ais_pinned_to_primary", return_value=True) as pinned:
+            await ReplicaRoutingMiddleware(view)(request)
+
+        pinned.assert_awaited_once_with(7)
+        self.assertEqual(self.routed_to, ["default"])
@@ -0,0 +1,53 @@
+"""
+URLconf for the ASGI server profile: the hot read endpoints are served
+by async views, everything else (and every other method on the same
+URLs) by the regular DRF views from app.urls.
+"""
+from django.urls import path
+
+from books.async_views import book_detail, book_list
+from books.views import BookViewSet
+from borrowings.async_views import borrowing_list
+from borrowings.views import BorrowingViewSet
+from payments.async_views import payment_detail
+from payments.views import PaymentsViewSet
+from .async_api import async_reads
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path(
+        "api/books/",
+        async_reads(
+            book_list,
+            BookViewSet.as_view({"get": "list", "post": "create"}),
+            require_authentication=False,
+        ),
+    ),
+    path(
+        "api/books/<int:pk>/",
+        async_reads(
+            book_detail,
+            BookViewSet.as_view({
+                "get": "retrieve",
+                "put": "update",
+                "patch": "partial_update",
+                "delete": "destroy",
+            }),
+            require_authentication=False,
+        ),
+    ),
+    path(
+        "api/borrowings/",
+        async_reads(
+            borrowing_list,
+            BorrowingViewSet.as_view({"get": "list", "post": "create"}),
+        ),
+    ),
+    path(
+        "api/payments/<int:pk>/",
+        async_reads(
+            payment_detail,
+            PaymentsViewSet.as_view({"get": "retrieve"}),
+        ),
+    ),
+] + sync_urlpatterns
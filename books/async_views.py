@@ -0,0 +1,20 @@
+from django.http import JsonResponse
+from rest_framework import status
+
+from app.async_api import error_response
+from .models import Book
+from .serializers import BookReadSerializer
+
+
+async def book_list(request, user):
+    books = [book async for book in Book.objects.all()]
+    return JsonResponse(BookReadSerializer(books, many=True).data, safe=False)
+
+
+async def book_detail(request, user, pk):
+    book = await Book.objects.filter(pk=pk).afirst()
+
+    if book is None:
+        return error_response("No Book matches the given query.", status.HTTP_404_NOT_FOUND)
+
+    return JsonResponse(BookReadSerializer(book).data)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Borrowing
+from .models import AccruedFine, Borrowing
 
 
 @admin.register(Borrowing)
@@ -14,3 +14,11 @@ class BorrowingAdmin(admin.ModelAdmin):
     )
     list_filter = ("borrow_date", "expected_return_date")
     search_fields = ("user__email", "book__title")
+
+
+@admin.register(AccruedFine)
+class AccruedFineAdmin(admin.ModelAdmin):
+    list_display = ("borrowing", "user", "overdue_days", "amount", "calculated_on")
+    list_select_related = ("borrowing__user", "borrowing__book", "user")
+    raw_id_fields = ("borrowing", "user")
+    ordering = ("-amount",)
@@ -0,0 +1,15 @@
+from django.http import JsonResponse
+
+from .serializers import BorrowingReadSerializer
+from .services import visible_borrowings
+
+
+async def borrowing_list(request, user):
+    borrowings = [
+        borrowing
+        async for borrowing in visible_borrowings(user, request.GET)
+    ]
+    return JsonResponse(
+        BorrowingReadSerializer(borrowings, many=True).data,
+        safe=False,
+    )
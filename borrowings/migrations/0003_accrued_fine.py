@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('borrowings', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccruedFine',
+            fields=[
+                ('borrowing', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='accrued_fine', serialize=False, to='borrowings.borrowing')),
+                ('overdue_days', models.PositiveIntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('calculated_on', models.DateField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='accrued_fines', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
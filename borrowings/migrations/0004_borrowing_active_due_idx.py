@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0001_initial'),
+        ('borrowings', '0003_accrued_fine'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='borrowing',
+            index=models.Index(condition=models.Q(('actual_return_date__isnull', True)), fields=['expected_return_date'], name='borrowing_active_due_idx'),
+        ),
+    ]
@@ -24,6 +24,13 @@ class Borrowing(models.Model):
 
     class Meta:
         ordering = ["-borrow_date", "-id"]
+        indexes = [
+            models.Index(
+                fields=["expected_return_date"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_active_due_idx",
+            ),
+        ]
 
     def clean(self):
         borrow_date = self.borrow_date or now().date()
@@ -44,3 +51,28 @@ class Borrowing(models.Model):
 
     def __str__(self):
         return f"{self.user} borrowed {self.book}"
+
+
+class AccruedFine(models.Model):
+    """
+    Fine accrued so far by an active overdue borrowing, recomputed
+    nightly by `borrowings.tasks.compute_accrued_fines`.
+    """
+    borrowing = models.OneToOneField(
+        Borrowing,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="accrued_fine",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="accrued_fines",
+    )
+
+    overdue_days = models.PositiveIntegerField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    calculated_on = models.DateField()
+
+    def __str__(self):
+        return f"{self.borrowing_id} | {self.overdue_days} days | {self.amount}"
@@ -1,17 +1,20 @@
 from django.db import transaction
 from rest_framework import serializers
 from django.utils.timezone import now
+from drf_spectacular.utils import extend_schema_field
 
 from books.models import Book
-from notifications.tasks import notify_borrowing_created
 from payments.models import Payment
-from .models import Borrowing
+from .models import AccruedFine, Borrowing
 from books.serializers import BookReadSerializer
 
 
 class BorrowingReadSerializer(serializers.ModelSerializer):
     book = BookReadSerializer(read_only=True)
     is_active = serializers.BooleanField(read_only=True)
+    accrued_fine = serializers.SerializerMethodField(
+        help_text="Fine accrued so far by an active overdue borrowing, as of the last nightly run."
+    )
 
     class Meta:
         model = Borrowing
@@ -22,8 +25,18 @@ class BorrowingReadSerializer(serializers.ModelSerializer):
             "expected_return_date",
             "actual_return_date",
             "is_active",
+            "accrued_fine",
         )
 
+    @extend_schema_field(
+        serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    )
+    def get_accrued_fine(self, obj):
+        try:
+            return str(obj.accrued_fine.amount)
+        except AccruedFine.DoesNotExist:
+            return None
+
 
 class BorrowingCreateSerializer(serializers.ModelSerializer):
 
@@ -53,7 +66,7 @@ class BorrowingCreateSerializer(serializers.ModelSerializer):
         if request:
             user = request.user
             has_pending_payment = Payment.objects.filter(
-                borrowing__user=user,
+                user=user,
                 status=Payment.Status.PENDING,
             ).exists()
 
@@ -1,7 +1,56 @@
 from datetime import date
 
+import numpy as np
+
+from .models import Borrowing
+
+
+def visible_borrowings(user, query_params):
+    """
+    Borrowings `user` may list, narrowed by the user_id (staff only)
+    and is_active query parameters.
+    """
+    queryset = Borrowing.objects.select_related("book", "user", "accrued_fine")
+
+    if not user.is_staff:
+        queryset = queryset.filter(user_id=user.pk)
+
+    user_id = query_params.get("user_id")
+    is_active = query_params.get("is_active")
+
+    if user_id and user.is_staff:
+        queryset = queryset.filter(user_id=user_id)
+
+    if is_active is not None:
+        queryset = queryset.filter(
+            actual_return_date__isnull=is_active.lower() == "true"
+        )
+
+    return queryset
+
 
 def calculate_overdue_days(*, expected: date, returned: date) -> int:
     if returned <= expected:
         return 0
     return (returned - expected).days
+
+
+def calculate_accrued_fines(
+    *,
+    expected: np.ndarray,
+    today: date,
+    daily_fee_cents: np.ndarray,
+    multiplier,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized `calculate_overdue_days` and fine formula over whole arrays.
+    Returns (overdue_days, fine amount in cents) per element.
+    """
+    overdue_days = np.maximum(
+        (np.datetime64(today, "D") - expected.astype("datetime64[D]")).astype(np.int64),
+        0,
+    )
+    amount_cents = np.rint(
+        overdue_days * daily_fee_cents * float(multiplier)
+    ).astype(np.int64)
+    return overdue_days, amount_cents
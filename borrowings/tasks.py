@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+import numpy as np
+from celery import shared_task
+from django.conf import settings
+from django.utils.timezone import now
+
+from .models import AccruedFine, Borrowing
+from .services import calculate_accrued_fines
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def compute_accrued_fines() -> int:
+    """
+    Recompute accrued fines for all active overdue borrowings.
+    Borrowings are read in id-ordered chunks of plain values, fines are
+    computed per chunk with array arithmetic and upserted in bulk.
+    """
+    today = now().date()
+    chunk_size = settings.ACCRUED_FINE_CHUNK_SIZE
+    last_id = 0
+    computed = 0
+
+    overdue = (
+        Borrowing.objects
+        .filter(
+            actual_return_date__isnull=True,
+            expected_return_date__lt=today,
+        )
+        .order_by("id")
+    )
+
+    while True:
+        rows = list(
+            overdue
+            .filter(id__gt=last_id)
+            .values_list("id", "user_id", "expected_return_date", "book__daily_fee")
+            [:chunk_size]
+        )
+
+        if not rows:
+            break
+
+        ids, user_ids, expected, daily_fees = zip(*rows)
+
+        overdue_days, amount_cents = calculate_accrued_fines(
+            expected=np.array(expected, dtype="datetime64[D]"),
+            today=today,
+            daily_fee_cents=np.rint(
+                np.array(daily_fees, dtype=np.float64) * 100
+            ).astype(np.int64),
+            multiplier=settings.FINE_MULTIPLIER,
+        )
+
+        AccruedFine.objects.bulk_create(
+            [
+                AccruedFine(
+                    borrowing_id=borrowing_id,
+                    user_id=user_id,
+                    overdue_days=int(days),
+                    amount=Decimal(int(cents)).scaleb(-2),
+                    calculated_on=today,
+                )
+                for borrowing_id, user_id, days, cents
+                in zip(ids, user_ids, overdue_days, amount_cents)
+            ],
+            update_conflicts=True,
+            unique_fields=["borrowing"],
+            update_fields=["overdue_days", "amount", "calculated_on"],
+        )
+
+        computed += len(rows)
+        last_id = ids[-1]
+
+    # Anything not refreshed today belongs to a borrowing that has
+    # since been returned.
+    AccruedFine.objects.filter(calculated_on__lt=today).delete()
+
+    return computed
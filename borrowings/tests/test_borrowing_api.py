@@ -9,6 +9,7 @@ from rest_framework.test import APITestCase
 
 from books.models import Book
 from borrowings.models import Borrowing
+from notifications.models import NotificationOutbox
 from payments.models import Payment
 
 
@@ -50,12 +51,10 @@ class BorrowingAPITests(APITestCase):
     # CREATE BORROWING
     # =====================================================
 
-    @patch("borrowings.views.notify_borrowing_created.delay")
     @patch("borrowings.views.create_checkout_session")
     def test_create_borrowing_creates_payment_and_reduces_inventory(
             self,
             mock_checkout,
-            mock_notify_created,
     ):
         mock_session = MagicMock()
         mock_session.id = "session_123"
@@ -88,14 +87,10 @@ class BorrowingAPITests(APITestCase):
     # RETURN OVERDUE → FINE
     # =====================================================
 
-    @patch("borrowings.views.notify_borrowing_returned.delay")
-    @patch("borrowings.views.notify_overdue_fine_created.delay")
     @patch("borrowings.views.create_checkout_session")
     def test_return_overdue_creates_fine(
         self,
         mock_checkout,
-        mock_notify_fine,
-        mock_notify_returned,
     ):
         mock_session = MagicMock()
         mock_session.id = "fine_session"
@@ -134,6 +129,20 @@ class BorrowingAPITests(APITestCase):
             ).exists()
         )
 
+        fine = Payment.objects.get(type=Payment.Type.FINE)
+        self.assertTrue(
+            NotificationOutbox.objects.filter(
+                event=NotificationOutbox.Event.OVERDUE_FINE_CREATED,
+                object_id=fine.id,
+            ).exists()
+        )
+        self.assertTrue(
+            NotificationOutbox.objects.filter(
+                event=NotificationOutbox.Event.BORROWING_RETURNED,
+                object_id=borrowing.id,
+            ).exists()
+        )
+
         mock_checkout.assert_called()
 
 
@@ -8,6 +8,7 @@ from rest_framework import status
 from users.models import User
 from books.models import Book
 from borrowings.models import Borrowing
+from notifications.models import NotificationOutbox
 from payments.models import Payment
 
 
@@ -38,12 +39,10 @@ class BorrowingCreateAPITests(APITestCase):
     # CREATE SUCCESS
     # ============================================================
 
-    @patch("borrowings.views.notify_borrowing_created.delay")
     @patch("borrowings.views.create_checkout_session")
     def test_create_borrowing_success(
         self,
         mock_create_checkout,
-        mock_notify_created,
     ):
         mock_session = MagicMock()
         mock_session.id = "sess_123"
@@ -72,6 +71,11 @@ class BorrowingCreateAPITests(APITestCase):
         payment = Payment.objects.first()
         self.assertEqual(payment.type, Payment.Type.PAYMENT)
         self.assertEqual(payment.status, Payment.Status.PENDING)
+        self.assertEqual(payment.user, self.user)
+
+        outbox = NotificationOutbox.objects.get()
+        self.assertEqual(outbox.event, NotificationOutbox.Event.BORROWING_CREATED)
+        self.assertEqual(outbox.object_id, response.data["id"])
 
         mock_create_checkout.assert_called_once()
 
@@ -101,6 +105,7 @@ class BorrowingCreateAPITests(APITestCase):
 
         self.assertEqual(Borrowing.objects.count(), 0)
         self.assertEqual(Payment.objects.count(), 0)
+        self.assertEqual(NotificationOutbox.objects.count(), 0)
 
     # ============================================================
     # INVENTORY ZERO
@@ -8,7 +8,7 @@ from datetime import date, timedelta
 
 from users.models import User
 from books.models import Book
-from borrowings.models import Borrowing
+from borrowings.models import AccruedFine, Borrowing
 from payments.models import Payment
 
 from django.test import override_settings
@@ -59,6 +59,21 @@ class BorrowingReturnAPITests(APITestCase):
 
         self.assertEqual(Payment.objects.filter(type=Payment.Type.FINE).count(), 0)
 
+    def test_return_response_drops_accrued_fine(self):
+        AccruedFine.objects.create(
+            borrowing=self.borrowing,
+            user=self.user,
+            overdue_days=3,
+            amount=Decimal("6.00"),
+            calculated_on=date.today(),
+        )
+
+        response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["accrued_fine"])
+        self.assertFalse(AccruedFine.objects.exists())
+
     def test_double_return_returns_400(self):
         self.client.post(self.url)
 
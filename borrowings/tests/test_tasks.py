@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.test import TestCase, override_settings
+
+from users.models import User
+from books.models import Book
+from borrowings.models import AccruedFine, Borrowing
+from borrowings.services import calculate_accrued_fines, calculate_overdue_days
+from borrowings.tasks import compute_accrued_fines
+
+
+class CalculateAccruedFinesTests(TestCase):
+
+    def test_matches_scalar_overdue_days(self):
+        today = date(2026, 3, 10)
+        expected = [date(2026, 3, 1), date(2026, 3, 10), date(2026, 3, 20)]
+
+        overdue_days, amount_cents = calculate_accrued_fines(
+            expected=np.array(expected, dtype="datetime64[D]"),
+            today=today,
+            daily_fee_cents=np.array([250, 1000, 1000]),
+            multiplier=2,
+        )
+
+        self.assertEqual(
+            overdue_days.tolist(),
+            [calculate_overdue_days(expected=e, returned=today) for e in expected],
+        )
+        self.assertEqual(amount_cents.tolist(), [4500, 0, 0])
+
+
+@override_settings(FINE_MULTIPLIER=2, ACCRUED_FINE_CHUNK_SIZE=2)
+class ComputeAccruedFinesTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@test.com",
+            password="password123"
+        )
+
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Author",
+            cover="HARD",
+            inventory=5,
+            daily_fee=Decimal("10.00"),
+        )
+
+    def _borrow(self, days_overdue, returned=False):
+        return Borrowing.objects.create(
+            user=self.user,
+            book=self.book,
+            expected_return_date=date.today() - timedelta(days=days_overdue),
+            actual_return_date=date.today() if returned else None,
+        )
+
+    def test_accrued_fines_are_computed_in_chunks(self):
+        overdue = [self._borrow(days) for days in (1, 2, 3)]
+        self._borrow(-5)
+        self._borrow(4, returned=True)
+
+        computed = compute_accrued_fines()
+
+        self.assertEqual(computed, 3)
+        self.assertEqual(AccruedFine.objects.count(), 3)
+
+        fine = AccruedFine.objects.get(borrowing=overdue[2])
+        self.assertEqual(fine.overdue_days, 3)
+        self.assertEqual(fine.amount, Decimal("60.00"))
+        self.assertEqual(fine.user, self.user)
+
+    def test_rerun_updates_and_drops_returned_borrowings(self):
+        borrowing = self._borrow(2)
+        returned = self._borrow(3)
+        AccruedFine.objects.create(
+            borrowing=borrowing,
+            user=self.user,
+            overdue_days=1,
+            amount=Decimal("20.00"),
+            calculated_on=date.today() - timedelta(days=1),
+        )
+        AccruedFine.objects.create(
+            borrowing=returned,
+            user=self.user,
+            overdue_days=2,
+            amount=Decimal("40.00"),
+            calculated_on=date.today() - timedelta(days=1),
+        )
+        returned.actual_return_date = date.today()
+        returned.save()
+
+        compute_accrued_fines()
+
+        fine = AccruedFine.objects.get()
+        self.assertEqual(fine.borrowing, borrowing)
+        self.assertEqual(fine.amount, Decimal("40.00"))
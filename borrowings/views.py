@@ -11,12 +11,9 @@ from rest_framework.exceptions import APIException
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from notifications.tasks import (
-    notify_borrowing_created,
-    notify_borrowing_returned,
-    notify_overdue_fine_created
-)
-from .models import Borrowing
+from notifications.models import NotificationOutbox
+from notifications.outbox import enqueue_notification
+from .models import AccruedFine
 from .serializers import (
     BorrowingReadSerializer,
     BorrowingCreateSerializer,
@@ -26,7 +23,7 @@ from books.models import Book
 
 from payments.models import Payment
 from payments.services import create_checkout_session
-from .services import calculate_overdue_days
+from .services import calculate_overdue_days, visible_borrowings
 
 @extend_schema_view(
     list=extend_schema(
@@ -90,23 +87,7 @@ class BorrowingViewSet(
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        queryset = Borrowing.objects.select_related("book", "user")
-
-        if not self.request.user.is_staff:
-            queryset = queryset.filter(user=self.request.user)
-
-        user_id = self.request.query_params.get("user_id")
-        is_active = self.request.query_params.get("is_active")
-
-        if user_id and self.request.user.is_staff:
-            queryset = queryset.filter(user_id=user_id)
-
-        if is_active is not None:
-            queryset = queryset.filter(
-                actual_return_date__isnull=is_active.lower() == "true"
-            )
-
-        return queryset
+        return visible_borrowings(self.request.user, self.request.query_params)
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -156,14 +137,16 @@ class BorrowingViewSet(
 
             Payment.objects.create(
                 borrowing=borrowing,
+                user=self.request.user,
                 type=Payment.Type.PAYMENT,
                 money_to_pay=book.daily_fee,
                 session_url=session.url,
                 session_id=session.id,
             )
 
-            transaction.on_commit(
-                lambda: notify_borrowing_created.delay(borrowing.id)
+            enqueue_notification(
+                NotificationOutbox.Event.BORROWING_CREATED,
+                borrowing.id,
             )
 
     @extend_schema(
@@ -199,6 +182,10 @@ class BorrowingViewSet(
             returned_date = now().date()
             borrowing.actual_return_date = returned_date
             borrowing.save(update_fields=["actual_return_date"])
+            AccruedFine.objects.filter(borrowing=borrowing).delete()
+            # get_object() loaded the fine with select_related; drop it so
+            # the response does not show the deleted row.
+            borrowing._state.fields_cache.pop("accrued_fine", None)
 
             book = Book.objects.select_for_update().get(id=borrowing.book.id)
             book.inventory += 1
@@ -221,21 +208,24 @@ class BorrowingViewSet(
                     amount=int(fine_amount * 100),
                 )
 
-                Payment.objects.create(
+                fine = Payment.objects.create(
                     borrowing=borrowing,
+                    user_id=borrowing.user_id,
                     type=Payment.Type.FINE,
                     money_to_pay=fine_amount,
                     session_id=session.id,
                     session_url=session.url,
                 )
 
-                transaction.on_commit(
-                    lambda: notify_overdue_fine_created.delay(borrowing.id)
+                enqueue_notification(
+                    NotificationOutbox.Event.OVERDUE_FINE_CREATED,
+                    fine.id,
                 )
 
-        transaction.on_commit(
-            lambda: notify_borrowing_returned.delay(borrowing.id)
-        )
+            enqueue_notification(
+                NotificationOutbox.Event.BORROWING_RETURNED,
+                borrowing.id,
+            )
 
         return Response(
             BorrowingReadSerializer(borrowing).data,
@@ -0,0 +1,80 @@
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BaseNotificationBackend:
+    def send(self, text: str) -> None:
+        raise NotImplementedError
+
+
+class TelegramBackend(BaseNotificationBackend):
+    def send(self, text: str) -> None:
+        from .services import send_telegram_message
+
+        send_telegram_message(text)
+
+
+class FileBackend(BaseNotificationBackend):
+    """
+    Append every message as one NDJSON line with its send time,
+    to NOTIFICATION_FILE_PATH.
+    """
+
+    _lock = threading.Lock()
+
+    def send(self, text: str) -> None:
+        line = json.dumps({"sent_at": time.time(), "text": text}, ensure_ascii=False)
+        with self._lock, open(settings.NOTIFICATION_FILE_PATH, "a", encoding="utf-8") as sink:
+            sink.write(line + "\n")
+
+
+class InMemoryBackend(BaseNotificationBackend):
+    """
+    Keep messages in process memory. Useful for load tests and tests
+    that run tasks in-process.
+    """
+
+    messages: list[str] = []
+    _lock = threading.Lock()
+
+    def send(self, text: str) -> None:
+        with self._lock:
+            self.messages.append(text)
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls.messages.clear()
+
+
+class NoopBackend(BaseNotificationBackend):
+    def send(self, text: str) -> None:
+        pass
+
+
+BACKENDS = {
+    "telegram": TelegramBackend,
+    "file": FileBackend,
+    "memory": InMemoryBackend,
+    "noop": NoopBackend,
+}
+
+_backends = {}
+
+
+def get_backend(name: str | None = None) -> BaseNotificationBackend:
+    """
+    Resolve NOTIFICATION_BACKEND, either a registered name or the
+    dotted path of a BaseNotificationBackend subclass.
+    """
+    name = name or settings.NOTIFICATION_BACKEND
+
+    if name not in _backends:
+        backend_class = BACKENDS.get(name) or import_string(name)
+        _backends[name] = backend_class()
+
+    return _backends[name]
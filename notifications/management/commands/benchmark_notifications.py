@@ -0,0 +1,231 @@
+import json
+import re
+import statistics
+import threading
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from celery import current_app
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+from django.utils.timezone import localdate
+
+from books.models import Book
+from borrowings.models import Borrowing
+from notifications.backends import BaseNotificationBackend
+from notifications.models import NotificationDelivery, NotificationOutbox
+from notifications.outbox import enqueue_notification, relay_outbox
+
+EVENT = NotificationOutbox.Event.BORROWING_CREATED
+BORROWING_ID = re.compile(r"Borrowing ID: (\d+)")
+
+
+class RecordingBackend(BaseNotificationBackend):
+    """
+    In-memory backend that also keeps the send time of each message,
+    for --eager runs.
+    """
+
+    deliveries: list[tuple[str, float]] = []
+    _lock = threading.Lock()
+
+    def send(self, text: str) -> None:
+        with self._lock:
+            self.deliveries.append((text, time.time()))
+
+
+class Command(BaseCommand):
+    help = (
+        "Push N borrowing-created events through the production "
+        "notification path: outbox row, relay, notify_borrowing_created, "
+        "backend. Reports throughput and the latency from committing the "
+        "outbox row to the send. This command acts as the relay; "
+        "fixture rows are created for the run and deleted afterwards.\n\n"
+        "By default tasks go through the broker, so Celery workers must "
+        "run with NOTIFICATION_BACKEND=file, the same "
+        "NOTIFICATION_FILE_PATH and TELEGRAM_DIGEST_ENABLED=False. With "
+        "--eager, tasks run inside the relay call in this process, so the "
+        "numbers are in-process call time, not queue latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=1000)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.NOTIFICATION_OUTBOX_BATCH_SIZE,
+            help="Outbox rows relayed per batch.",
+        )
+        parser.add_argument(
+            "--eager",
+            action="store_true",
+            help="Run tasks in-process instead of through the broker.",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=300,
+            help="Seconds to wait for workers to deliver every event.",
+        )
+
+    def handle(self, *args, **options):
+        count = options["events"]
+        user, book, borrowing_ids = self._create_fixtures(count)
+
+        try:
+            with override_settings(TELEGRAM_DIGEST_ENABLED=False):
+                if options["eager"]:
+                    enqueued_at, deliveries = self._run_eager(
+                        borrowing_ids, options["batch_size"]
+                    )
+                else:
+                    enqueued_at, deliveries = self._run_through_broker(
+                        borrowing_ids, options["batch_size"], options["timeout"]
+                    )
+        finally:
+            self._delete_fixtures(user, book, borrowing_ids)
+
+        self._report(enqueued_at, deliveries, eager=options["eager"])
+
+    # ===============================
+    # Fixtures
+    # ===============================
+
+    def _create_fixtures(self, count):
+        run_id = uuid.uuid4().hex[:8]
+
+        user = get_user_model().objects.create_user(
+            email=f"benchmark-{run_id}@example.com",
+            password=None,
+        )
+        book = Book.objects.create(
+            title=f"Benchmark {run_id}",
+            author="Benchmark",
+            cover=Book.CoverType.SOFT,
+            inventory=0,
+            daily_fee=0,
+        )
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                user=user,
+                book=book,
+                expected_return_date=localdate() + timedelta(days=1),
+            )
+            for _ in range(count)
+        )
+        borrowing_ids = list(
+            Borrowing.objects.filter(book=book).order_by("id").values_list("id", flat=True)
+        )
+
+        return user, book, borrowing_ids
+
+    def _delete_fixtures(self, user, book, borrowing_ids):
+        NotificationOutbox.objects.filter(event=EVENT, object_id__in=borrowing_ids).delete()
+        NotificationDelivery.objects.filter(event=EVENT, object_id__in=borrowing_ids).delete()
+        book.delete()
+        user.delete()
+
+    # ===============================
+    # Runs
+    # ===============================
+
+    def _publish(self, borrowing_ids, batch_size):
+        """
+        Write one outbox row per business transaction, relaying each
+        batch as the relay process would. Returns commit times by id.
+        """
+        enqueued_at = {}
+
+        for start in range(0, len(borrowing_ids), batch_size):
+            for borrowing_id in borrowing_ids[start:start + batch_size]:
+                with transaction.atomic():
+                    enqueue_notification(EVENT, borrowing_id)
+                enqueued_at[borrowing_id] = time.time()
+
+            while relay_outbox(batch_size):
+                pass
+
+        return enqueued_at
+
+    def _run_eager(self, borrowing_ids, batch_size):
+        RecordingBackend.deliveries.clear()
+        backend = f"{RecordingBackend.__module__}.{RecordingBackend.__name__}"
+        always_eager = current_app.conf.task_always_eager
+
+        current_app.conf.task_always_eager = True
+        try:
+            with override_settings(NOTIFICATION_BACKEND=backend):
+                enqueued_at = self._publish(borrowing_ids, batch_size)
+        finally:
+            current_app.conf.task_always_eager = always_eager
+
+        return enqueued_at, self._match(RecordingBackend.deliveries, enqueued_at)
+
+    def _run_through_broker(self, borrowing_ids, batch_size, timeout):
+        sink = Path(settings.NOTIFICATION_FILE_PATH)
+        offset = sink.stat().st_size if sink.exists() else 0
+
+        enqueued_at = self._publish(borrowing_ids, batch_size)
+
+        deadline = time.monotonic() + timeout
+        deliveries = []
+
+        while len(deliveries) < len(enqueued_at):
+            if time.monotonic() > deadline:
+                raise CommandError(
+                    f"Only {len(deliveries)}/{len(enqueued_at)} events delivered "
+                    f"within {timeout}s"
+                )
+            time.sleep(0.5)
+
+            if not sink.exists():
+                continue
+
+            with sink.open(encoding="utf-8") as lines:
+                lines.seek(offset)
+                sent = [(entry["text"], entry["sent_at"]) for entry in map(json.loads, lines)]
+            deliveries = self._match(sent, enqueued_at)
+
+        return enqueued_at, deliveries
+
+    @staticmethod
+    def _match(sent, enqueued_at):
+        """
+        (borrowing id, send time) of the messages about this run's
+        borrowings.
+        """
+        deliveries = []
+        for text, sent_at in sent:
+            match = BORROWING_ID.search(text)
+            if match and int(match.group(1)) in enqueued_at:
+                deliveries.append((int(match.group(1)), sent_at))
+        return deliveries
+
+    def _report(self, enqueued_at, deliveries, *, eager):
+        latencies = sorted(
+            sent_at - enqueued_at[borrowing_id]
+            for borrowing_id, sent_at in deliveries
+        )
+        elapsed = max(sent_at for _, sent_at in deliveries) - min(enqueued_at.values())
+        count = len(deliveries)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+        if eager:
+            self.stdout.write(
+                "eager: tasks ran in-process inside the relay, without a "
+                "broker or workers; latency is call time, not queue latency"
+            )
+        self.stdout.write(
+            f"{count} events in {elapsed:.2f}s ({count / elapsed:.0f} events/s)\n"
+            f"outbox-to-send latency mean {statistics.mean(latencies) * 1000:.1f}ms | "
+            f"p50 {percentile(0.50) * 1000:.1f}ms | "
+            f"p95 {percentile(0.95) * 1000:.1f}ms | "
+            f"p99 {percentile(0.99) * 1000:.1f}ms"
+        )
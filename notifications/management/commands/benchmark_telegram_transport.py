@@ -0,0 +1,59 @@
+import time
+
+import requests
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from notifications import transport
+from notifications.testing import StubTelegramServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare notification transports against a local stub Telegram "
+        "server: a fresh connection per message, the pooled session and "
+        "the asyncio client."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=20)
+
+    def handle(self, *args, **options):
+        count = options["messages"]
+        concurrency = options["concurrency"]
+        texts = [f"Benchmark message #{i}" for i in range(count)]
+
+        with StubTelegramServer() as server, override_settings(
+            TELEGRAM_API_URL=server.url,
+            TELEGRAM_BOT_TOKEN="benchmark",
+            TELEGRAM_CHAT_ID="0",
+            TELEGRAM_RATE_LIMIT_ENABLED=False,
+        ):
+            def fresh_connections():
+                for text in texts:
+                    requests.post(
+                        transport.telegram_url(),
+                        json=transport.message_payload(text),
+                        timeout=10,
+                    )
+
+            def pooled_session():
+                for text in texts:
+                    transport.post_message(text)
+
+            def async_client():
+                transport.post_messages(texts, concurrency=concurrency)
+
+            for name, run in (
+                ("fresh connection", fresh_connections),
+                ("pooled session", pooled_session),
+                (f"async (concurrency={concurrency})", async_client),
+            ):
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{name:<28} {count} messages in {elapsed:.2f}s "
+                    f"({count / elapsed:.0f} msg/s)"
+                )
@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import relay_outbox
+
+
+class Command(BaseCommand):
+    help = "Drain the notification outbox into Celery in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.NOTIFICATION_OUTBOX_BATCH_SIZE,
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.NOTIFICATION_OUTBOX_POLL_INTERVAL,
+            help="Seconds to sleep when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the outbox once and exit.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        while True:
+            relayed = relay_outbox(batch_size)
+
+            if relayed:
+                self.stdout.write(f"Relayed {relayed} notifications")
+
+            if relayed < batch_size:
+                if options["once"]:
+                    return
+                time.sleep(options["interval"])
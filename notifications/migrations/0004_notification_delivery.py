@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(choices=[('borrowing_created', 'Borrowing created'), ('borrowing_returned', 'Borrowing returned'), ('overdue_fine_created', 'Overdue fine created'), ('payment_completed', 'Payment completed')], max_length=32)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('delivered_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('event', 'object_id'), name='unique_notification_delivery')],
+            },
+        ),
+    ]
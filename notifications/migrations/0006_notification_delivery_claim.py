@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_reminder_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationdelivery',
+            name='claimed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='notificationdelivery',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
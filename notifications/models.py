@@ -0,0 +1,123 @@
+from django.db import models
+from django.utils import timezone
+
+
+class BufferedNotification(models.Model):
+    """
+    Rendered message waiting to be merged into a Telegram digest.
+    """
+    text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.created_at} | {self.text[:50]}"
+
+
+class OverdueWatermark(models.Model):
+    """
+    Active borrowings due before `overdue_before` have already been
+    reported as overdue; the next run only looks at later due dates.
+    """
+    overdue_before = models.DateField()
+
+
+class NotificationOutbox(models.Model):
+    """
+    Notification event written in the same transaction as the business
+    change and handed to Celery later by the outbox relay.
+    """
+    class Event(models.TextChoices):
+        BORROWING_CREATED = "borrowing_created", "Borrowing created"
+        BORROWING_RETURNED = "borrowing_returned", "Borrowing returned"
+        OVERDUE_FINE_CREATED = "overdue_fine_created", "Overdue fine created"
+        PAYMENT_COMPLETED = "payment_completed", "Payment completed"
+
+    event = models.CharField(max_length=32, choices=Event.choices)
+    object_id = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.event} | {self.object_id}"
+
+
+class NotificationDelivery(models.Model):
+    """
+    Ledger of sent notifications. A sender claims the (event, object)
+    row under its unique constraint before sending and marks it
+    delivered afterwards, so duplicate enqueues and retries never send
+    twice. A claim without `delivered_at` is in flight; it is released
+    when the send fails and may be taken over once it is older than
+    NOTIFICATION_CLAIM_TIMEOUT.
+    """
+    event = models.CharField(max_length=32, choices=NotificationOutbox.Event.choices)
+    object_id = models.PositiveBigIntegerField()
+    claimed_at = models.DateTimeField(default=timezone.now)
+    delivered_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "object_id"],
+                name="unique_notification_delivery",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event} | {self.object_id} | {self.delivered_at or 'pending'}"
+
+
+class ReminderRun(models.Model):
+    """
+    Progress of one day's reminder fan-out, so a crashed run resumes
+    after the last borrowing it dispatched instead of starting over.
+    """
+    class Kind(models.TextChoices):
+        DUE_SOON = "due_soon", "Due soon"
+        OVERDUE = "overdue", "Overdue"
+
+    run_date = models.DateField()
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    last_borrowing_id = models.PositiveBigIntegerField(default=0)
+    dispatched = models.PositiveIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["run_date", "kind"],
+                name="unique_reminder_run",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.run_date} | {self.kind} | {self.dispatched}"
+
+
+class ReminderDelivery(models.Model):
+    """
+    Per-borrower ledger of one reminder run, claimed before the email
+    is sent like NotificationDelivery, so a re-dispatched or retried
+    batch never emails the same borrower twice.
+    """
+    run_date = models.DateField()
+    kind = models.CharField(max_length=16, choices=ReminderRun.Kind.choices)
+    borrowing_id = models.PositiveBigIntegerField()
+    claimed_at = models.DateTimeField(default=timezone.now)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["run_date", "kind", "borrowing_id"],
+                name="unique_reminder_delivery",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.run_date} | {self.kind} | {self.borrowing_id}"
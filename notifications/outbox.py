@@ -0,0 +1,55 @@
+from celery import current_app
+from django.db import transaction
+
+from .models import NotificationOutbox
+from .tasks import (
+    notify_borrowing_created,
+    notify_borrowing_returned,
+    notify_overdue_fine_created,
+    notify_payment_completed,
+)
+
+OUTBOX_TASKS = {
+    NotificationOutbox.Event.BORROWING_CREATED: notify_borrowing_created,
+    NotificationOutbox.Event.BORROWING_RETURNED: notify_borrowing_returned,
+    NotificationOutbox.Event.OVERDUE_FINE_CREATED: notify_overdue_fine_created,
+    NotificationOutbox.Event.PAYMENT_COMPLETED: notify_payment_completed,
+}
+
+
+def enqueue_notification(event: str, object_id: int) -> NotificationOutbox:
+    """
+    Record a notification event. Call it inside the transaction that
+    makes the business change, so the event commits or rolls back with it.
+    """
+    return NotificationOutbox.objects.create(event=event, object_id=object_id)
+
+
+def relay_outbox(batch_size: int) -> int:
+    """
+    Hand one batch of outbox events to Celery over a single producer
+    connection. Rows are locked with SKIP LOCKED, so several relays can
+    drain the outbox in parallel, and they are only deleted once every
+    message of the batch has been published.
+    """
+    with transaction.atomic():
+        entries = list(
+            NotificationOutbox.objects
+            .select_for_update(skip_locked=True)
+            .order_by("id")
+            .values_list("id", "event", "object_id")
+            [:batch_size]
+        )
+
+        if not entries:
+            return 0
+
+        with current_app.producer_or_acquire() as producer:
+            for _, event, object_id in entries:
+                OUTBOX_TASKS[event].apply_async((object_id,), producer=producer)
+
+        NotificationOutbox.objects.filter(
+            id__in=[entry_id for entry_id, _, _ in entries]
+        ).delete()
+
+    return len(entries)
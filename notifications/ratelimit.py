@@ -0,0 +1,163 @@
+import asyncio
+import time
+
+import redis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+# Two token buckets (global and per chat) plus a shared penalty key set
+# from Telegram's Retry-After. A token is taken from both buckets only
+# when both have one; otherwise the script returns the wait in ms.
+TOKEN_BUCKET_SCRIPT = """
+local penalty = redis.call('PTTL', KEYS[3])
+if penalty > 0 then
+    return penalty
+end
+
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local function refill(key, rate, burst)
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+    if tokens < 1 then
+        return tokens, math.ceil((1 - tokens) * 1000 / rate)
+    end
+    return tokens, 0
+end
+
+local global_rate, global_burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local chat_rate, chat_burst = tonumber(ARGV[3]), tonumber(ARGV[4])
+
+local global_tokens, global_wait = refill(KEYS[1], global_rate, global_burst)
+local chat_tokens, chat_wait = refill(KEYS[2], chat_rate, chat_burst)
+
+local wait = math.max(global_wait, chat_wait)
+if wait > 0 then
+    return wait
+end
+
+redis.call('HSET', KEYS[1], 'tokens', global_tokens - 1, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(global_burst * 1000 / global_rate))
+redis.call('HSET', KEYS[2], 'tokens', chat_tokens - 1, 'ts', now)
+redis.call('PEXPIRE', KEYS[2], math.ceil(chat_burst * 1000 / chat_rate))
+return 0
+"""
+
+_limiter = None
+
+
+class RateLimited(Exception):
+    """
+    Raised when a send has to wait longer than the caller allows,
+    or when Telegram itself answered with 429.
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry after {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+
+class TelegramRateLimiter:
+    def __init__(
+        self,
+        client: redis.Redis,
+        *,
+        global_rate: float,
+        global_burst: int,
+        chat_rate: float,
+        chat_burst: int,
+        prefix: str = "telegram:ratelimit",
+    ):
+        self.client = client
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.prefix = prefix
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def try_acquire(self, chat_id) -> float:
+        """
+        Take a token for `chat_id`. Returns 0 on success, otherwise the
+        number of seconds until a token may be available.
+        """
+        wait_ms = self._script(
+            keys=[
+                f"{self.prefix}:global",
+                f"{self.prefix}:chat:{chat_id}",
+                f"{self.prefix}:penalty",
+            ],
+            args=[
+                self.global_rate,
+                self.global_burst,
+                self.chat_rate,
+                self.chat_burst,
+            ],
+        )
+        return int(wait_ms) / 1000
+
+    def acquire(self, chat_id, *, max_wait: float) -> None:
+        """
+        Block until a token is taken, sleeping at most `max_wait` seconds
+        in total. Longer waits raise RateLimited so the caller can
+        reschedule instead of holding a worker.
+        """
+        deadline = time.monotonic() + max_wait
+
+        while True:
+            wait = self.try_acquire(chat_id)
+            if wait == 0:
+                return
+
+            if time.monotonic() + wait > deadline:
+                raise RateLimited(wait)
+
+            time.sleep(wait)
+
+    async def aacquire(self, chat_id, *, max_wait: float) -> None:
+        """
+        acquire() for async callers: waits with asyncio.sleep instead of
+        blocking the thread.
+        """
+        deadline = time.monotonic() + max_wait
+
+        while True:
+            wait = await sync_to_async(self.try_acquire, thread_sensitive=False)(chat_id)
+            if wait == 0:
+                return
+
+            if time.monotonic() + wait > deadline:
+                raise RateLimited(wait)
+
+            await asyncio.sleep(wait)
+
+    def penalize(self, retry_after: float) -> None:
+        """
+        Pause every sender until Telegram's Retry-After has elapsed.
+        """
+        self.client.set(
+            f"{self.prefix}:penalty",
+            1,
+            px=max(1, int(retry_after * 1000)),
+        )
+
+
+def get_rate_limiter() -> TelegramRateLimiter | None:
+    global _limiter
+
+    if not settings.TELEGRAM_RATE_LIMIT_ENABLED:
+        return None
+
+    if _limiter is None:
+        _limiter = TelegramRateLimiter(
+            redis.Redis.from_url(settings.TELEGRAM_RATE_LIMIT_REDIS_URL),
+            global_rate=settings.TELEGRAM_GLOBAL_RATE,
+            global_burst=settings.TELEGRAM_GLOBAL_BURST,
+            chat_rate=settings.TELEGRAM_CHAT_RATE,
+            chat_burst=settings.TELEGRAM_CHAT_BURST,
+        )
+
+    return _limiter
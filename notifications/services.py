@@ -1,12 +1,147 @@
-import requests
+from collections.abc import Iterable, Iterator
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
 
+from .backends import get_backend
+from .ratelimit import RateLimited, get_rate_limiter
+from .transport import apost_message, post_message
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+DIGEST_SEPARATOR = "\n\n"
+
+
+def send_notification(text: str) -> None:
+    """
+    Send through the backend selected by NOTIFICATION_BACKEND.
+    """
+    get_backend().send(text)
+
 
 def send_telegram_message(text: str) -> None:
-    url = f"https://api.telegram.org/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": settings.TELEGRAM_CHAT_ID,
-        "text": text,
-        "parse_mode": "HTML",
-    }
-    requests.post(url, json=payload, timeout=10)
+    limiter = get_rate_limiter()
+
+    if limiter:
+        limiter.acquire(
+            settings.TELEGRAM_CHAT_ID,
+            max_wait=settings.TELEGRAM_RATE_LIMIT_MAX_WAIT,
+        )
+
+    response = post_message(text)
+
+    if response.status_code == 429:
+        retry_after = get_retry_after(response)
+        if limiter:
+            limiter.penalize(retry_after)
+        raise RateLimited(retry_after)
+
+    response.raise_for_status()
+
+
+async def asend_telegram_message(text: str) -> None:
+    """
+    Awaitable send_telegram_message with the same rate limiting.
+    """
+    limiter = get_rate_limiter()
+
+    if limiter:
+        await limiter.aacquire(
+            settings.TELEGRAM_CHAT_ID,
+            max_wait=settings.TELEGRAM_RATE_LIMIT_MAX_WAIT,
+        )
+
+    response = await apost_message(text)
+
+    if response.status_code == 429:
+        retry_after = get_retry_after(response)
+        if limiter:
+            await sync_to_async(limiter.penalize, thread_sensitive=False)(retry_after)
+        raise RateLimited(retry_after)
+
+    response.raise_for_status()
+
+
+def get_retry_after(response) -> float:
+    """
+    Telegram reports the wait in `parameters.retry_after`; fall back
+    to the Retry-After header and then to one second.
+    """
+    try:
+        return float(response.json()["parameters"]["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        pass
+
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return 1.0
+
+
+def split_text(text: str, limit: int = TELEGRAM_MESSAGE_LIMIT) -> list[str]:
+    """
+    Split a text longer than `limit` at line breaks, then at spaces.
+    A hard cut never lands inside an HTML tag, so every part still
+    parses in Telegram's HTML mode.
+    """
+    parts = []
+
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit + 1)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, limit + 1)
+
+        if cut > 0:
+            parts.append(text[:cut])
+            text = text[cut + 1:]
+            continue
+
+        cut = limit
+        tag_start = text.rfind("<", 0, cut)
+        if tag_start > max(0, text.rfind(">", 0, cut)):
+            cut = tag_start
+        parts.append(text[:cut])
+        text = text[cut:]
+
+    if text:
+        parts.append(text)
+
+    return parts
+
+
+def pack_digest(
+    texts: Iterable[str],
+    limit: int = TELEGRAM_MESSAGE_LIMIT,
+    separator: str = DIGEST_SEPARATOR,
+) -> Iterator[tuple[str, int]]:
+    """
+    Merge texts no longer than `limit` into as few messages as
+    possible. Yields each message with the number of input texts fully
+    contained in it and the messages before it.
+    """
+    current = ""
+    count = 0
+
+    for count, text in enumerate(texts):
+        if current and len(current) + len(separator) + len(text) > limit:
+            yield current, count
+            current = ""
+        current = f"{current}{separator}{text}" if current else text
+
+    if current:
+        yield current, count + 1
+
+
+def build_digest_messages(
+    texts: Iterable[str],
+    limit: int = TELEGRAM_MESSAGE_LIMIT,
+    separator: str = DIGEST_SEPARATOR,
+) -> Iterator[str]:
+    """
+    Merge texts into as few messages as possible, each at most `limit`
+    characters. Texts are only split between lines or words, never
+    in the middle of an HTML tag.
+    """
+    parts = (part for text in texts for part in split_text(text, limit))
+
+    for message, _ in pack_digest(parts, limit, separator):
+        yield message
@@ -1,60 +1,176 @@
-from celery import shared_task
+from collections import deque
+from datetime import date, timedelta
+
+from celery import Task, group, shared_task
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
 from django.utils.timezone import now
 
+from app.routers import use_replica
 from borrowings.models import Borrowing
 from payments.models import Payment
-from .services import send_telegram_message
+from .models import (
+    BufferedNotification,
+    NotificationDelivery,
+    NotificationOutbox,
+    OverdueWatermark,
+    ReminderDelivery,
+    ReminderRun,
+)
+from .ratelimit import RateLimited
+from .services import (
+    TELEGRAM_MESSAGE_LIMIT,
+    pack_digest,
+    send_notification,
+    split_text,
+)
 
 
-@shared_task(
-    bind=True,
-    autoretry_for=(Exception,),
-    retry_backoff=True,
-    retry_kwargs={"max_retries": 5},
-)
-def notify(text: str) -> None:
-    send_telegram_message(text)
+class NotificationTask(Task):
+    """
+    Rate limiting is not a failure: instead of burning one of the
+    autoretries, the task is re-enqueued once the limiter allows it.
+
+    Tasks that send several messages attach the kwargs to resume after
+    the last sent one as `exc.resume`; both the re-enqueue and retries
+    pass them on, so nothing already sent goes out again.
+    """
+    dont_autoretry_for = (RateLimited,)
+
+    def __call__(self, *args, **kwargs):
+        try:
+            return super().__call__(*args, **kwargs)
+        except RateLimited as exc:
+            kwargs = {**kwargs, **getattr(exc, "resume", {})}
+            self.apply_async(args, kwargs, countdown=exc.retry_after)
+
+    def retry(self, args=None, kwargs=None, exc=None, **options):
+        resume = getattr(exc, "resume", None)
+        if resume:
+            kwargs = {**(self.request.kwargs if kwargs is None else kwargs), **resume}
+        return super().retry(args=args, kwargs=kwargs, exc=exc, **options)
+
+
+def deliver(text: str) -> None:
+    """
+    Send a message right away, or buffer it for the next digest
+    flush when TELEGRAM_DIGEST_ENABLED is set.
+    """
+    if settings.TELEGRAM_DIGEST_ENABLED:
+        BufferedNotification.objects.create(text=text)
+        return
+
+    send_notification(text)
+
+
+def claim_delivery(model, **key) -> bool:
+    """
+    Take the ledger row of `model` (NotificationDelivery or
+    ReminderDelivery) identified by `key`. Returns False when it was
+    delivered already or another sender holds a live claim on it.
+    """
+    delivery, created = model.objects.get_or_create(**key)
+    if created:
+        return True
+    if delivery.delivered_at:
+        return False
+
+    # An abandoned claim (worker killed mid-send) can be taken over.
+    stale_before = now() - timedelta(seconds=settings.NOTIFICATION_CLAIM_TIMEOUT)
+    return bool(
+        model.objects
+        .filter(pk=delivery.pk, delivered_at__isnull=True, claimed_at__lt=stale_before)
+        .update(claimed_at=now())
+    )
+
+
+def complete_delivery(model, **key) -> None:
+    model.objects.filter(**key).update(delivered_at=now())
+
+
+def release_delivery(model, **key) -> None:
+    model.objects.filter(delivered_at__isnull=True, **key).delete()
+
+
+def deliver_once(event: str, object_id: int, render) -> None:
+    """
+    Deliver `render(object_id)` at most once per (event, object_id).
+    The claim is released when rendering finds nothing to send or the
+    send fails, so a retry can claim it again.
+    """
+    key = {"event": event, "object_id": object_id}
+    if not claim_delivery(NotificationDelivery, **key):
+        return
+
+    try:
+        message = render(object_id)
+        if message is not None:
+            deliver(message)
+    except BaseException:
+        release_delivery(NotificationDelivery, **key)
+        raise
+
+    if message is None:
+        release_delivery(NotificationDelivery, **key)
+    else:
+        complete_delivery(NotificationDelivery, **key)
 
 
 @shared_task(
     bind=True,
+    base=NotificationTask,
     autoretry_for=(Exception,),
     retry_backoff=True,
     retry_kwargs={"max_retries": 5},
 )
-def notify_payment_completed(self, payment_id: int) -> None:
+def notify(self, text: str) -> None:
+    deliver(text)
+
+
+def render_payment_completed(payment_id: int) -> str | None:
     payment = (
         Payment.objects
-        .select_related("borrowing", "borrowing__user")
+        .select_related("user")
         .filter(id=payment_id)
         .first()
     )
 
     if not payment:
-        return
+        return None
 
     if payment.type == Payment.Type.FINE:
         header = "⚠️ <b>Fine payment completed</b>"
     else:
         header = "💰 <b>Payment completed</b>"
 
-    message = (
+    return (
         f"{header}\n"
         f"Borrowing ID: {payment.borrowing_id}\n"
-        f"User: {payment.borrowing.user.email}\n"
+        f"User: {payment.user.email}\n"
         f"Amount: ${payment.money_to_pay}"
     )
 
-    send_telegram_message(message)
-
 
 @shared_task(
     bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    base=NotificationTask,
     autoretry_for=(Exception,),
     retry_backoff=True,
     retry_kwargs={"max_retries": 5},
 )
-def notify_borrowing_created(self, borrowing_id: int) -> None:
+def notify_payment_completed(self, payment_id: int) -> None:
+    deliver_once(
+        NotificationOutbox.Event.PAYMENT_COMPLETED,
+        payment_id,
+        render_payment_completed,
+    )
+
+
+def render_borrowing_created(borrowing_id: int) -> str | None:
     borrowing = (
         Borrowing.objects
         .select_related("book", "user")
@@ -63,9 +179,9 @@ def notify_borrowing_created(self, borrowing_id: int) -> None:
     )
 
     if not borrowing:
-        return
+        return None
 
-    message = (
+    return (
         "📚 <b>New borrowing created</b>\n"
         f"Borrowing ID: {borrowing.id}\n"
         f"User: {borrowing.user.email}\n"
@@ -73,16 +189,25 @@ def notify_borrowing_created(self, borrowing_id: int) -> None:
         f"Expected return: {borrowing.expected_return_date}"
     )
 
-    send_telegram_message(message)
-
 
 @shared_task(
     bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    base=NotificationTask,
     autoretry_for=(Exception,),
     retry_backoff=True,
     retry_kwargs={"max_retries": 5},
 )
-def notify_borrowing_returned(self, borrowing_id: int) -> None:
+def notify_borrowing_created(self, borrowing_id: int) -> None:
+    deliver_once(
+        NotificationOutbox.Event.BORROWING_CREATED,
+        borrowing_id,
+        render_borrowing_created,
+    )
+
+
+def render_borrowing_returned(borrowing_id: int) -> str | None:
     borrowing = (
         Borrowing.objects
         .select_related("book", "user")
@@ -91,77 +216,422 @@ def notify_borrowing_returned(self, borrowing_id: int) -> None:
     )
 
     if not borrowing:
-        return
+        return None
 
-    message = (
+    return (
         "🔄 <b>Borrowing returned</b>\n"
         f"User: {borrowing.user.email}\n"
         f"Book: {borrowing.book.title}\n"
         f"Returned: {borrowing.actual_return_date}"
     )
 
-    send_telegram_message(message)
-
 
 @shared_task(
     bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    base=NotificationTask,
     autoretry_for=(Exception,),
     retry_backoff=True,
     retry_kwargs={"max_retries": 5},
 )
-def notify_overdue_fine_created(self, payment_id: int) -> None:
+def notify_borrowing_returned(self, borrowing_id: int) -> None:
+    deliver_once(
+        NotificationOutbox.Event.BORROWING_RETURNED,
+        borrowing_id,
+        render_borrowing_returned,
+    )
+
+
+def render_overdue_fine_created(payment_id: int) -> str | None:
     payment = (
         Payment.objects
-        .select_related("borrowing", "borrowing__book", "borrowing__user")
+        .select_related("borrowing__book", "user")
         .filter(id=payment_id)
         .first()
     )
 
     if not payment:
-        return
+        return None
 
-    message = (
+    return (
         "⚠️ <b>Overdue fine created</b>\n"
-        f"User: {payment.borrowing.user.email}\n"
+        f"User: {payment.user.email}\n"
         f"Book: {payment.borrowing.book.title}\n"
         f"Fine: ${payment.money_to_pay}"
     )
 
-    send_telegram_message(message)
+
+@shared_task(
+    bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    base=NotificationTask,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 5},
+)
+def notify_overdue_fine_created(self, payment_id: int) -> None:
+    deliver_once(
+        NotificationOutbox.Event.OVERDUE_FINE_CREATED,
+        payment_id,
+        render_overdue_fine_created,
+    )
+
+
+def report_overdue(borrowings, header: str, after: list | None = None) -> int:
+    """
+    Stream overdue borrowings as plain values and send them in
+    messages that fit Telegram's limit, so memory stays constant
+    no matter how many loans are overdue. Returns messages sent.
+
+    `after` is the [due date, id] of the last borrowing already sent.
+    When a send fails, the exception carries `resume={"after": ...}`
+    pointing at the last borrowing of the last message that went out.
+    """
+    borrowings = borrowings.order_by("expected_return_date", "id")
+    if after:
+        due, borrowing_id = date.fromisoformat(after[0]), after[1]
+        borrowings = borrowings.filter(
+            Q(expected_return_date__gt=due)
+            | Q(expected_return_date=due, id__gt=borrowing_id)
+        )
+
+    rows = (
+        borrowings
+        .values_list("id", "user__email", "book__title", "expected_return_date")
+        .iterator(chunk_size=settings.OVERDUE_SCAN_CHUNK_SIZE)
+    )
+
+    # Keys of the most recently read rows: a message is yielded once the
+    # row after its last one has been read, so two are enough.
+    recent = deque(maxlen=2)
+
+    def lines():
+        for index, (borrowing_id, email, title, due) in enumerate(rows):
+            recent.append((index, [due.isoformat(), borrowing_id]))
+            line = f"- {email} | {title} | Due: {due}"
+            yield header + line if index == 0 else line
+
+    sent = 0
+    cursor = after
+
+    try:
+        for message, sent_rows in pack_digest(lines(), separator="\n"):
+            deliver(message)
+            sent += 1
+            cursor = next(key for index, key in recent if index == sent_rows - 1)
+    except Exception as exc:
+        if cursor:
+            exc.resume = {"after": cursor}
+        raise
+
+    return sent
+
+
+@shared_task(
+    bind=True,
+    base=NotificationTask,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 5},
+)
+def check_overdue_borrowings(self, after: list | None = None) -> None:
+    """
+    Full summary of every overdue borrowing, read from the replica.
+    """
+    today = now().date()
+
+    overdue = Borrowing.objects.filter(
+        expected_return_date__lt=today,
+        actual_return_date__isnull=True,
+    )
+
+    with use_replica():
+        report_overdue(overdue, "⏰ <b>Overdue borrowings detected</b>\n\n", after)
+
+
+@shared_task(
+    bind=True,
+    base=NotificationTask,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 5},
+)
+def detect_new_overdue_borrowings(
+    self,
+    after: list | None = None,
+    today: str | None = None,
+) -> int:
+    """
+    Report only borrowings that became overdue since the last run.
+    The due-date window between the watermark and today is read
+    through the partial index on active borrowings' due dates.
+    A resumed run keeps the `today` of the run it continues.
+    """
+    today = date.fromisoformat(today) if today else now().date()
+    watermark = OverdueWatermark.objects.first()
+
+    if watermark and watermark.overdue_before >= today:
+        return 0
+
+    newly_overdue = Borrowing.objects.filter(
+        expected_return_date__lt=today,
+        actual_return_date__isnull=True,
+    )
+    if watermark:
+        newly_overdue = newly_overdue.filter(
+            expected_return_date__gte=watermark.overdue_before,
+        )
+
+    try:
+        sent = report_overdue(
+            newly_overdue,
+            "⏰ <b>New overdue borrowings</b>\n\n",
+            after,
+        )
+    except Exception as exc:
+        if getattr(exc, "resume", None):
+            exc.resume["today"] = today.isoformat()
+        raise
+
+    if watermark:
+        watermark.overdue_before = today
+        watermark.save(update_fields=["overdue_before"])
+    else:
+        OverdueWatermark.objects.create(overdue_before=today)
+
+    return sent
 
 
 @shared_task(
     bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    base=NotificationTask,
     autoretry_for=(Exception,),
     retry_backoff=True,
     retry_kwargs={"max_retries": 5},
 )
-def check_overdue_borrowings(self) -> None:
+def flush_notification_digest(self) -> int:
+    """
+    Merge buffered notifications into as few Telegram messages as
+    possible. The buffer is held until its oldest entry reaches
+    TELEGRAM_DIGEST_MAX_LATENCY or it can fill a whole message.
+    A failed send puts back only the texts not yet sent, so a retry
+    never repeats a delivered digest.
+    """
+    oldest = BufferedNotification.objects.order_by("id").first()
+
+    if oldest is None:
+        return 0
+
+    max_latency = timedelta(seconds=settings.TELEGRAM_DIGEST_MAX_LATENCY)
+    if now() - oldest.created_at < max_latency:
+        buffered = sum(
+            len(text)
+            for text in BufferedNotification.objects.values_list("text", flat=True)
+            [:settings.TELEGRAM_DIGEST_BATCH_SIZE]
+        )
+        if buffered < TELEGRAM_MESSAGE_LIMIT:
+            return 0
+
+    sent = 0
+
+    while True:
+        # Take the batch off the buffer in a short transaction, so row
+        # locks are never held across Telegram calls and a rollback can
+        # never resurrect texts that were already sent.
+        with transaction.atomic():
+            batch = list(
+                BufferedNotification.objects
+                .select_for_update(skip_locked=True)
+                .order_by("id")
+                .values_list("id", "created_at", "text")
+                [:settings.TELEGRAM_DIGEST_BATCH_SIZE]
+            )
+
+            if not batch:
+                break
+
+            BufferedNotification.objects.filter(id__in=[row[0] for row in batch]).delete()
+
+        parts = [part for _, _, text in batch for part in split_text(text)]
+        done = 0
+
+        try:
+            for message, sent_parts in pack_digest(parts):
+                send_notification(message)
+                sent += 1
+                done = sent_parts
+        except BaseException:
+            # Put back only what was not sent, keeping its age, so the
+            # next flush picks it up.
+            if done < len(parts):
+                requeued = BufferedNotification.objects.bulk_create(
+                    BufferedNotification(text=part) for part in parts[done:]
+                )
+                BufferedNotification.objects.filter(
+                    id__in=[notification.id for notification in requeued],
+                ).update(created_at=min(created_at for _, created_at, _ in batch))
+            raise
+
+    return sent
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def purge_notification_deliveries() -> int:
+    """
+    Drop ledger entries (notifications and reminders) older than
+    NOTIFICATION_DELIVERY_TTL; by then no retry or duplicate enqueue of
+    the event can still be pending.
+    """
+    cutoff = now() - settings.NOTIFICATION_DELIVERY_TTL
+    deleted, _ = NotificationDelivery.objects.filter(
+        Q(delivered_at__lt=cutoff) | Q(delivered_at__isnull=True, claimed_at__lt=cutoff)
+    ).delete()
+    reminders, _ = ReminderDelivery.objects.filter(run_date__lt=cutoff.date()).delete()
+    return deleted + reminders
+
+
+REMINDER_TEMPLATES = {
+    ReminderRun.Kind.DUE_SOON: (
+        "Reminder: \"{title}\" is due on {due}",
+        "The book \"{title}\" you borrowed is due on {due}. "
+        "Please return it on time to avoid overdue fines.",
+    ),
+    ReminderRun.Kind.OVERDUE: (
+        "Overdue: \"{title}\" was due on {due}",
+        "The book \"{title}\" you borrowed was due on {due}. "
+        "Fines accrue for every overdue day until it is returned.",
+    ),
+}
+
+
+def dispatch_reminders(kind: str, borrowings, run_date) -> int:
+    """
+    Walk `borrowings` in id-ordered pages and fan each page out to
+    send_reminder_batch tasks as a Celery group. Progress is saved only
+    after a page is published, so a run that crashes or cannot reach the
+    broker resumes from that page; a page published twice is harmless,
+    as the ReminderDelivery ledger sends each reminder once.
+    """
+    run, _ = ReminderRun.objects.get_or_create(run_date=run_date, kind=kind)
+
+    if run.completed_at:
+        return 0
+
+    batch_size = settings.REMINDER_BATCH_SIZE
+    dispatched = 0
+
+    while True:
+        ids = list(
+            borrowings
+            .filter(id__gt=run.last_borrowing_id)
+            .order_by("id")
+            .values_list("id", flat=True)
+            [:settings.REMINDER_PAGE_SIZE]
+        )
+
+        if not ids:
+            break
+
+        group([
+            send_reminder_batch.s(kind, ids[start:start + batch_size], run_date.isoformat())
+            for start in range(0, len(ids), batch_size)
+        ]).apply_async()
+
+        run.last_borrowing_id = ids[-1]
+        run.dispatched += len(ids)
+        run.save(update_fields=["last_borrowing_id", "dispatched"])
+
+        dispatched += len(ids)
+
+    run.completed_at = now()
+    run.save(update_fields=["completed_at"])
+
+    return dispatched
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def schedule_due_reminders() -> int:
+    """
+    Send per-user reminders REMINDER_DAYS_BEFORE days before the due
+    date and on every overdue day.
+    """
     today = now().date()
+    active = Borrowing.objects.filter(actual_return_date__isnull=True)
+    due_soon_date = today + timedelta(days=settings.REMINDER_DAYS_BEFORE)
 
-    overdue = (
-        Borrowing.objects
-        .select_related("book", "user")
-        .filter(
-            expected_return_date__lt=today,
-            actual_return_date__isnull=True,
+    return (
+        dispatch_reminders(
+            ReminderRun.Kind.DUE_SOON,
+            active.filter(expected_return_date=due_soon_date),
+            today,
+        )
+        + dispatch_reminders(
+            ReminderRun.Kind.OVERDUE,
+            active.filter(expected_return_date__lt=today),
+            today,
         )
     )
 
-    if not overdue.exists():
-        return
 
-    lines = []
-    for borrowing in overdue:
-        lines.append(
-            f"- {borrowing.user.email} | "
-            f"{borrowing.book.title} | "
-            f"Due: {borrowing.expected_return_date}"
-        )
+@shared_task(
+    bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 5},
+)
+def send_reminder_batch(
+    self,
+    kind: str,
+    borrowing_ids: list[int],
+    run_date: str | None = None,
+) -> int:
+    """
+    Email one batch of reminders over a single mail connection.
+    Borrowings returned since the fan-out are skipped, and so are
+    borrowers this run already emailed, so a retry after a partial
+    failure only sends the rest.
+    """
+    subject_template, body_template = REMINDER_TEMPLATES[kind]
+    run_date = date.fromisoformat(run_date) if run_date else now().date()
 
-    message = (
-        "⏰ <b>Overdue borrowings detected</b>\n\n"
-        + "\n".join(lines)
+    rows = list(
+        Borrowing.objects
+        .filter(id__in=borrowing_ids, actual_return_date__isnull=True)
+        .order_by("id")
+        .values_list("id", "user__email", "book__title", "expected_return_date")
     )
 
-    send_telegram_message(message)
+    if not rows:
+        return 0
+
+    sent = 0
+
+    with get_connection() as connection:
+        for borrowing_id, email, title, due in rows:
+            key = {"run_date": run_date, "kind": kind, "borrowing_id": borrowing_id}
+            if not claim_delivery(ReminderDelivery, **key):
+                continue
+
+            message = EmailMessage(
+                subject=subject_template.format(title=title, due=due),
+                body=body_template.format(title=title, due=due),
+                to=[email],
+                connection=connection,
+            )
+
+            try:
+                message.send()
+            except BaseException:
+                release_delivery(ReminderDelivery, **key)
+                raise
+
+            complete_delivery(ReminderDelivery, **key)
+            sent += 1
+
+    return sent
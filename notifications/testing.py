@@ -0,0 +1,65 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubTelegramHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between requests.
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY
+    # delayed ACKs would stall every keep-alive response.
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.server.requests_count += 1
+
+        body = json.dumps(self.server.response_body).encode()
+        self.send_response(self.server.response_status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubTelegramServer:
+    """
+    Local HTTP server answering every request like a Telegram
+    sendMessage call (successful unless told otherwise). Use as a
+    context manager; point TELEGRAM_API_URL at `url`.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        status: int = 200,
+        response: dict | None = None,
+    ):
+        self._server = ThreadingHTTPServer((host, port), _StubTelegramHandler)
+        self._server.daemon_threads = True
+        self._server.requests_count = 0
+        self._server.response_status = status
+        self._server.response_body = response if response is not None else {"ok": True}
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests_count(self) -> int:
+        return self._server.requests_count
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
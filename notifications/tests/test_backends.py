@@ -0,0 +1,104 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from notifications.backends import (
+    FileBackend,
+    InMemoryBackend,
+    NoopBackend,
+    TelegramBackend,
+    get_backend,
+)
+from borrowings.models import Borrowing
+from notifications.management.commands.benchmark_notifications import RecordingBackend
+from notifications.models import NotificationDelivery, NotificationOutbox
+from notifications.outbox import relay_outbox
+from notifications.tasks import deliver
+
+
+class NotificationBackendTests(TestCase):
+
+    def setUp(self):
+        InMemoryBackend.reset()
+
+    # ===============================
+    # Registry
+    # ===============================
+
+    def test_get_backend_resolves_registered_names(self):
+        self.assertIsInstance(get_backend("telegram"), TelegramBackend)
+        self.assertIsInstance(get_backend("file"), FileBackend)
+        self.assertIsInstance(get_backend("memory"), InMemoryBackend)
+        self.assertIsInstance(get_backend("noop"), NoopBackend)
+
+    def test_get_backend_accepts_dotted_path(self):
+        backend = get_backend("notifications.backends.NoopBackend")
+
+        self.assertIsInstance(backend, NoopBackend)
+
+    @override_settings(NOTIFICATION_BACKEND="memory")
+    def test_get_backend_defaults_to_setting(self):
+        self.assertIsInstance(get_backend(), InMemoryBackend)
+
+    # ===============================
+    # Backends
+    # ===============================
+
+    def test_file_backend_appends_ndjson(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "sink.ndjson"
+
+            with override_settings(NOTIFICATION_FILE_PATH=str(path)):
+                FileBackend().send("first")
+                FileBackend().send("second")
+
+            entries = [json.loads(line) for line in path.read_text().splitlines()]
+
+        self.assertEqual([entry["text"] for entry in entries], ["first", "second"])
+        self.assertTrue(all("sent_at" in entry for entry in entries))
+
+    @patch("notifications.services.send_telegram_message")
+    def test_telegram_backend_sends_to_telegram(self, mock_send):
+        TelegramBackend().send("hello")
+
+        mock_send.assert_called_once_with("hello")
+
+    @override_settings(NOTIFICATION_BACKEND="memory", TELEGRAM_DIGEST_ENABLED=False)
+    def test_deliver_goes_through_configured_backend(self):
+        deliver("hello")
+
+        self.assertEqual(InMemoryBackend.messages, ["hello"])
+
+    # ===============================
+    # Benchmark
+    # ===============================
+
+    def test_benchmark_eager_run_goes_through_outbox_and_relay(self):
+        out = StringIO()
+
+        with patch(
+            "notifications.management.commands.benchmark_notifications.relay_outbox",
+            wraps=relay_outbox,
+        ) as mock_relay:
+            call_command(
+                "benchmark_notifications", events=20, batch_size=8, eager=True, stdout=out
+            )
+
+        self.assertEqual(len(RecordingBackend.deliveries), 20)
+        self.assertTrue(all(
+            text.startswith("📚 <b>New borrowing created</b>")
+            for text, _ in RecordingBackend.deliveries
+        ))
+        self.assertGreaterEqual(mock_relay.call_count, 3)
+        self.assertIn("not queue latency", out.getvalue())
+        self.assertIn("20 events in", out.getvalue())
+
+        # Fixture rows are removed again.
+        self.assertFalse(Borrowing.objects.exists())
+        self.assertFalse(NotificationOutbox.objects.exists())
+        self.assertFalse(NotificationDelivery.objects.exists())
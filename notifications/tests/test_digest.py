@@ -0,0 +1,114 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+
+from notifications.models import BufferedNotification
+from notifications.services import build_digest_messages
+from notifications.tasks import deliver, flush_notification_digest
+
+
+class BuildDigestMessagesTests(TestCase):
+
+    def test_merges_texts_within_limit(self):
+        messages = list(build_digest_messages(["a" * 4, "b" * 4, "c" * 4], limit=10))
+
+        self.assertEqual(messages, ["aaaa\n\nbbbb", "cccc"])
+
+    def test_splits_text_longer_than_limit(self):
+        messages = list(build_digest_messages(["x", "y" * 25], limit=10))
+
+        self.assertEqual(messages, ["x", "y" * 10, "y" * 10, "y" * 5])
+        self.assertTrue(all(len(message) <= 10 for message in messages))
+
+    def test_splits_long_text_between_lines(self):
+        text = "\n".join(f"<b>line {i}</b>" for i in range(10))
+
+        messages = list(build_digest_messages([text], limit=40))
+
+        self.assertEqual("\n".join(messages), text)
+        for message in messages:
+            self.assertLessEqual(len(message), 40)
+            self.assertEqual(message.count("<b>"), message.count("</b>"))
+
+    def test_hard_cut_never_lands_inside_a_tag(self):
+        messages = list(build_digest_messages(["x" * 8 + "<b>y</b>"], limit=10))
+
+        self.assertEqual(messages, ["x" * 8, "<b>y</b>"])
+
+
+@override_settings(
+    TELEGRAM_DIGEST_ENABLED=True,
+    TELEGRAM_DIGEST_MAX_LATENCY=60,
+    TELEGRAM_DIGEST_BATCH_SIZE=500,
+)
+class NotificationDigestTests(TestCase):
+
+    @patch("notifications.tasks.send_notification")
+    def test_deliver_buffers_in_digest_mode(self, mock_send):
+        deliver("hello")
+
+        mock_send.assert_not_called()
+        self.assertEqual(BufferedNotification.objects.count(), 1)
+
+    @override_settings(TELEGRAM_DIGEST_ENABLED=False)
+    @patch("notifications.tasks.send_notification")
+    def test_deliver_sends_immediately_without_digest(self, mock_send):
+        deliver("hello")
+
+        mock_send.assert_called_once_with("hello")
+        self.assertEqual(BufferedNotification.objects.count(), 0)
+
+    @patch("notifications.tasks.send_notification")
+    def test_flush_merges_buffer_into_one_message(self, mock_send):
+        for i in range(20):
+            deliver(f"event {i}")
+        BufferedNotification.objects.update(created_at=now() - timedelta(minutes=5))
+
+        sent = flush_notification_digest()
+
+        self.assertEqual(sent, 1)
+        mock_send.assert_called_once()
+        self.assertIn("event 19", mock_send.call_args.args[0])
+        self.assertEqual(BufferedNotification.objects.count(), 0)
+
+    @patch("notifications.tasks.send_notification")
+    def test_flush_waits_for_max_latency(self, mock_send):
+        deliver("fresh event")
+
+        sent = flush_notification_digest()
+
+        self.assertEqual(sent, 0)
+        mock_send.assert_not_called()
+        self.assertEqual(BufferedNotification.objects.count(), 1)
+
+    @patch("notifications.tasks.send_notification")
+    def test_flush_sends_early_when_buffer_fills_a_message(self, mock_send):
+        for _ in range(5):
+            deliver("x" * 1000)
+
+        sent = flush_notification_digest()
+
+        self.assertEqual(sent, 2)
+        self.assertEqual(BufferedNotification.objects.count(), 0)
+
+    @patch("notifications.tasks.send_notification")
+    def test_failed_flush_keeps_only_unsent_texts(self, mock_send):
+        for i in range(5):
+            deliver(f"{i}" * 1000)
+        mock_send.side_effect = [None, ConnectionError("telegram down")]
+
+        with self.assertRaises(ConnectionError):
+            flush_notification_digest()
+
+        sent_text = mock_send.call_args_list[0].args[0]
+        remaining = list(BufferedNotification.objects.values_list("text", flat=True))
+        self.assertEqual(len(remaining), 5 - sent_text.count("\n\n") - 1)
+        self.assertTrue(all(text not in sent_text for text in remaining))
+
+        mock_send.side_effect = None
+        BufferedNotification.objects.update(created_at=now() - timedelta(minutes=5))
+        flush_notification_digest()
+
+        self.assertEqual(BufferedNotification.objects.count(), 0)
@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from users.models import User
+from books.models import Book
+from borrowings.models import Borrowing
+from notifications.models import NotificationOutbox
+from notifications.outbox import enqueue_notification, relay_outbox
+
+
+class NotificationOutboxTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@test.com",
+            password="password123"
+        )
+
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Author",
+            cover="HARD",
+            inventory=5,
+            daily_fee=Decimal("10.00"),
+        )
+
+        self.borrowing = Borrowing.objects.create(
+            user=self.user,
+            book=self.book,
+            expected_return_date=date.today() + timedelta(days=3),
+        )
+
+    @patch("notifications.outbox.notify_borrowing_returned.apply_async")
+    @patch("notifications.outbox.notify_borrowing_created.apply_async")
+    def test_relay_dispatches_batch_and_clears_outbox(
+        self,
+        mock_created,
+        mock_returned,
+    ):
+        for _ in range(3):
+            enqueue_notification(
+                NotificationOutbox.Event.BORROWING_CREATED,
+                self.borrowing.id,
+            )
+        enqueue_notification(
+            NotificationOutbox.Event.BORROWING_RETURNED,
+            self.borrowing.id,
+        )
+
+        relayed = relay_outbox(batch_size=2)
+
+        self.assertEqual(relayed, 2)
+        self.assertEqual(mock_created.call_count, 2)
+        self.assertEqual(NotificationOutbox.objects.count(), 2)
+
+        relayed = relay_outbox(batch_size=10)
+
+        self.assertEqual(relayed, 2)
+        self.assertEqual(mock_created.call_count, 3)
+        mock_returned.assert_called_once()
+        self.assertEqual(mock_returned.call_args.args[0], (self.borrowing.id,))
+        self.assertEqual(NotificationOutbox.objects.count(), 0)
+
+    @patch("notifications.outbox.notify_borrowing_created.apply_async")
+    def test_failed_publish_keeps_events(self, mock_created):
+        mock_created.side_effect = ConnectionError("broker down")
+        enqueue_notification(
+            NotificationOutbox.Event.BORROWING_CREATED,
+            self.borrowing.id,
+        )
+
+        with self.assertRaises(ConnectionError):
+            relay_outbox(batch_size=10)
+
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+
+    def test_relay_with_empty_outbox(self):
+        self.assertEqual(relay_outbox(batch_size=10), 0)
@@ -0,0 +1,162 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+
+from users.models import User
+from books.models import Book
+from borrowings.models import Borrowing
+from notifications.models import ReminderRun
+from notifications.tasks import schedule_due_reminders, send_reminder_batch
+
+
+@override_settings(
+    REMINDER_DAYS_BEFORE=2,
+    REMINDER_PAGE_SIZE=4,
+    REMINDER_BATCH_SIZE=2,
+)
+class DueRemindersTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@test.com",
+            password="password123"
+        )
+
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Author",
+            cover="HARD",
+            inventory=5,
+            daily_fee=Decimal("10.00"),
+        )
+
+    def _borrow(self, due_in_days, returned=False):
+        return Borrowing.objects.create(
+            user=self.user,
+            book=self.book,
+            expected_return_date=date.today() + timedelta(days=due_in_days),
+            actual_return_date=date.today() if returned else None,
+        )
+
+    def _dispatched_batches(self, mock_group):
+        return [
+            (signature.args[0], signature.args[1])
+            for call in mock_group.call_args_list
+            for signature in call.args[0]
+        ]
+
+    @patch("notifications.tasks.group")
+    def test_fans_out_id_ordered_batches(self, mock_group):
+        overdue = [self._borrow(-1) for _ in range(5)]
+        due_soon = self._borrow(2)
+        self._borrow(5)
+        self._borrow(-3, returned=True)
+
+        dispatched = schedule_due_reminders()
+
+        self.assertEqual(dispatched, 6)
+        overdue_ids = [b.id for b in overdue]
+        self.assertEqual(
+            self._dispatched_batches(mock_group),
+            [
+                (ReminderRun.Kind.DUE_SOON, [due_soon.id]),
+                (ReminderRun.Kind.OVERDUE, overdue_ids[0:2]),
+                (ReminderRun.Kind.OVERDUE, overdue_ids[2:4]),
+                (ReminderRun.Kind.OVERDUE, overdue_ids[4:5]),
+            ],
+        )
+        self.assertEqual(
+            ReminderRun.objects.filter(completed_at__isnull=False).count(), 2
+        )
+
+    @patch("notifications.tasks.group")
+    def test_resumes_after_last_dispatched_borrowing(self, mock_group):
+        overdue = [self._borrow(-1) for _ in range(3)]
+        ReminderRun.objects.create(
+            run_date=date.today(),
+            kind=ReminderRun.Kind.OVERDUE,
+            last_borrowing_id=overdue[1].id,
+            dispatched=2,
+        )
+
+        schedule_due_reminders()
+
+        self.assertEqual(
+            self._dispatched_batches(mock_group),
+            [(ReminderRun.Kind.OVERDUE, [overdue[2].id])],
+        )
+        run = ReminderRun.objects.get(kind=ReminderRun.Kind.OVERDUE)
+        self.assertEqual(run.dispatched, 3)
+
+    @patch("notifications.tasks.group")
+    def test_completed_run_is_not_repeated(self, mock_group):
+        self._borrow(-1)
+        ReminderRun.objects.create(
+            run_date=date.today(),
+            kind=ReminderRun.Kind.OVERDUE,
+            completed_at=now(),
+        )
+
+        schedule_due_reminders()
+
+        self.assertEqual(self._dispatched_batches(mock_group), [])
+
+    def test_send_reminder_batch_emails_each_active_borrower(self):
+        active = self._borrow(-1)
+        returned = self._borrow(-1, returned=True)
+
+        sent = send_reminder_batch(
+            ReminderRun.Kind.OVERDUE,
+            [active.id, returned.id],
+        )
+
+        self.assertEqual(sent, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["user@test.com"])
+        self.assertIn("Overdue", mail.outbox[0].subject)
+
+    @patch("notifications.tasks.group")
+    def test_page_is_dispatched_again_when_publishing_fails(self, mock_group):
+        borrowing = self._borrow(-1)
+        mock_group.return_value.apply_async.side_effect = ConnectionError
+
+        with self.assertRaises(ConnectionError):
+            schedule_due_reminders()
+
+        run = ReminderRun.objects.get(kind=ReminderRun.Kind.OVERDUE)
+        self.assertEqual(run.last_borrowing_id, 0)
+        self.assertIsNone(run.completed_at)
+
+        mock_group.reset_mock()
+        mock_group.return_value.apply_async.side_effect = None
+        schedule_due_reminders()
+
+        self.assertEqual(
+            self._dispatched_batches(mock_group),
+            [(ReminderRun.Kind.OVERDUE, [borrowing.id])],
+        )
+
+    def test_retried_batch_only_emails_the_rest(self):
+        borrowings = [self._borrow(-1) for _ in range(3)]
+        ids = [borrowing.id for borrowing in borrowings]
+        sends = []
+
+        def fail_on_second(message, *args, **kwargs):
+            sends.append(message)
+            if len(sends) == 2:
+                raise ConnectionError("smtp down")
+            return 1
+
+        with patch("django.core.mail.EmailMessage.send", autospec=True, side_effect=fail_on_second):
+            with self.assertRaises(ConnectionError):
+                send_reminder_batch(ReminderRun.Kind.OVERDUE, ids)
+
+        sent = send_reminder_batch(ReminderRun.Kind.OVERDUE, ids)
+
+        self.assertEqual(sent, 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(send_reminder_batch(ReminderRun.Kind.OVERDUE, ids), 0)
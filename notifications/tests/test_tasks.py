@@ -2,7 +2,8 @@ from datetime import date, timedelta
 from decimal import Decimal
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
 
 from users.models import User
 from books.models import Book
@@ -14,7 +15,13 @@ from notifications.tasks import (
     notify_overdue_fine_created,
     notify_payment_completed,
     check_overdue_borrowings,
+    detect_new_overdue_borrowings,
+    flush_notification_digest,
+    notify,
+    send_reminder_batch,
 )
+from notifications.ratelimit import RateLimited
+from notifications.models import NotificationDelivery, NotificationOutbox, OverdueWatermark
 
 
 class NotificationTasksTests(TestCase):
@@ -51,12 +58,57 @@ class NotificationTasksTests(TestCase):
     # Borrowing created
     # ===============================
 
-    @patch("notifications.tasks.send_telegram_message")
+    @patch("notifications.tasks.send_notification")
     def test_notify_borrowing_created(self, mock_send):
         notify_borrowing_created.run(self.borrowing.id)
         mock_send.assert_called_once()
 
-    @patch("notifications.tasks.send_telegram_message")
+    @patch("notifications.tasks.send_notification")
+    def test_notify_borrowing_created_is_sent_once(self, mock_send):
+        notify_borrowing_created.run(self.borrowing.id)
+        notify_borrowing_created.run(self.borrowing.id)
+
+        mock_send.assert_called_once()
+        self.assertEqual(NotificationDelivery.objects.count(), 1)
+
+    @patch("notifications.tasks.send_notification")
+    def test_failed_send_is_not_recorded(self, mock_send):
+        mock_send.side_effect = [ConnectionError("timeout"), None]
+
+        with self.assertRaises(ConnectionError):
+            notify_borrowing_created.run(self.borrowing.id)
+        self.assertEqual(NotificationDelivery.objects.count(), 0)
+
+        notify_borrowing_created.run(self.borrowing.id)
+        self.assertEqual(mock_send.call_count, 2)
+        self.assertEqual(NotificationDelivery.objects.count(), 1)
+
+    @patch("notifications.tasks.send_notification")
+    def test_in_flight_claim_blocks_concurrent_send(self, mock_send):
+        NotificationDelivery.objects.create(
+            event=NotificationOutbox.Event.BORROWING_CREATED,
+            object_id=self.borrowing.id,
+        )
+
+        notify_borrowing_created.run(self.borrowing.id)
+
+        mock_send.assert_not_called()
+
+    @override_settings(NOTIFICATION_CLAIM_TIMEOUT=60)
+    @patch("notifications.tasks.send_notification")
+    def test_abandoned_claim_is_taken_over(self, mock_send):
+        NotificationDelivery.objects.create(
+            event=NotificationOutbox.Event.BORROWING_CREATED,
+            object_id=self.borrowing.id,
+            claimed_at=timezone.now() - timedelta(minutes=5),
+        )
+
+        notify_borrowing_created.run(self.borrowing.id)
+
+        mock_send.assert_called_once()
+        self.assertIsNotNone(NotificationDelivery.objects.get().delivered_at)
+
+    @patch("notifications.tasks.send_notification")
     def test_notify_borrowing_created_not_found(self, mock_send):
         notify_borrowing_created(999)
         mock_send.assert_not_called()
@@ -65,7 +117,7 @@ class NotificationTasksTests(TestCase):
     # Borrowing returned
     # ===============================
 
-    @patch("notifications.tasks.send_telegram_message")
+    @patch("notifications.tasks.send_notification")
     def test_notify_borrowing_returned(self, mock_send):
         self.borrowing.actual_return_date = date.today()
         self.borrowing.save()
@@ -77,12 +129,12 @@ class NotificationTasksTests(TestCase):
     # Payment completed
     # ===============================
 
-    @patch("notifications.tasks.send_telegram_message")
+    @patch("notifications.tasks.send_notification")
     def test_notify_payment_completed(self, mock_send):
         notify_payment_completed.run(self.payment.id)
         mock_send.assert_called_once()
 
-    @patch("notifications.tasks.send_telegram_message")
+    @patch("notifications.tasks.send_notification")
     def test_notify_payment_completed_not_found(self, mock_send):
         notify_payment_completed.run(999)
         mock_send.assert_not_called()
@@ -91,7 +143,7 @@ class NotificationTasksTests(TestCase):
     # Overdue fine created
     # ===============================
 
-    @patch("notifications.tasks.send_telegram_message")
+    @patch("notifications.tasks.send_notification")
     def test_notify_overdue_fine_created(self, mock_send):
         fine = Payment.objects.create(
             borrowing=self.borrowing,
@@ -107,7 +159,7 @@ class NotificationTasksTests(TestCase):
     # Overdue checker
     # ===============================
 
-    @patch("notifications.tasks.send_telegram_message")
+    @patch("notifications.tasks.send_notification")
     def test_check_overdue_borrowings_with_overdue(self, mock_send):
         self.borrowing.expected_return_date = date.today() - timedelta(days=2)
         self.borrowing.save()
@@ -115,7 +167,111 @@ class NotificationTasksTests(TestCase):
         check_overdue_borrowings()
         self.assertTrue(mock_send.called)
 
-    @patch("notifications.tasks.send_telegram_message")
+    @override_settings(OVERDUE_SCAN_CHUNK_SIZE=10)
+    @patch("notifications.tasks.send_notification")
+    def test_check_overdue_borrowings_splits_long_reports(self, mock_send):
+        Borrowing.objects.bulk_create([
+            Borrowing(
+                user=self.user,
+                book=self.book,
+                expected_return_date=date.today() - timedelta(days=1),
+            )
+            for _ in range(150)
+        ])
+
+        check_overdue_borrowings()
+
+        self.assertGreater(mock_send.call_count, 1)
+        messages = [call.args[0] for call in mock_send.call_args_list]
+        self.assertTrue(all(len(message) <= 4096 for message in messages))
+        self.assertEqual(
+            sum(message.count("Due:") for message in messages),
+            150,
+        )
+
+    @override_settings(OVERDUE_SCAN_CHUNK_SIZE=10)
+    @patch("notifications.tasks.check_overdue_borrowings.apply_async")
+    @patch("notifications.tasks.send_notification")
+    def test_rate_limited_report_resumes_after_last_sent_message(
+        self,
+        mock_send,
+        mock_apply_async,
+    ):
+        Borrowing.objects.bulk_create([
+            Borrowing(
+                user=self.user,
+                book=self.book,
+                expected_return_date=date.today() - timedelta(days=1 + i % 3),
+            )
+            for i in range(150)
+        ])
+        mock_send.side_effect = [None, RateLimited(2)]
+
+        check_overdue_borrowings()
+
+        first_message = mock_send.call_args_list[0].args[0]
+        args, kwargs = mock_apply_async.call_args.args
+        self.assertEqual(mock_apply_async.call_args.kwargs, {"countdown": 2})
+
+        mock_send.reset_mock(side_effect=True)
+        check_overdue_borrowings(**kwargs)
+
+        rest = [call.args[0] for call in mock_send.call_args_list]
+        self.assertEqual(
+            first_message.count("Due:") + sum(message.count("Due:") for message in rest),
+            150,
+        )
+
+    @patch("notifications.tasks.send_notification")
     def test_check_overdue_borrowings_no_overdue(self, mock_send):
         check_overdue_borrowings()
         mock_send.assert_not_called()
+
+    # ===============================
+    # Incremental overdue detection
+    # ===============================
+
+    @patch("notifications.tasks.send_notification")
+    def test_detect_new_overdue_reports_only_since_watermark(self, mock_send):
+        self.borrowing.expected_return_date = date.today() - timedelta(days=10)
+        self.borrowing.save()
+        newly_overdue = Borrowing.objects.create(
+            user=self.user,
+            book=self.book,
+            expected_return_date=date.today() - timedelta(days=1),
+        )
+        OverdueWatermark.objects.create(
+            overdue_before=date.today() - timedelta(days=1)
+        )
+
+        detect_new_overdue_borrowings()
+
+        mock_send.assert_called_once()
+        message = mock_send.call_args.args[0]
+        self.assertIn(str(newly_overdue.expected_return_date), message)
+        self.assertNotIn(str(self.borrowing.expected_return_date), message)
+        self.assertEqual(
+            OverdueWatermark.objects.get().overdue_before,
+            date.today(),
+        )
+
+    @patch("notifications.tasks.send_notification")
+    def test_detect_new_overdue_is_noop_later_the_same_day(self, mock_send):
+        self.borrowing.expected_return_date = date.today() - timedelta(days=1)
+        self.borrowing.save()
+
+        detect_new_overdue_borrowings()
+        detect_new_overdue_borrowings()
+
+        mock_send.assert_called_once()
+
+
+class TaskAcknowledgementTests(SimpleTestCase):
+
+    def test_only_redelivery_safe_tasks_ack_late(self):
+        self.assertTrue(notify_borrowing_created.acks_late)
+        self.assertTrue(flush_notification_digest.acks_late)
+        self.assertTrue(send_reminder_batch.acks_late)
+
+        for task in (notify, check_overdue_borrowings, detect_new_overdue_borrowings):
+            self.assertFalse(task.acks_late, task.name)
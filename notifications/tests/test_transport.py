@@ -0,0 +1,105 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from notifications import transport
+from notifications.ratelimit import RateLimited
+from notifications.services import asend_telegram_message, send_telegram_message
+from notifications.tasks import notify_borrowing_created
+from notifications.testing import StubTelegramServer
+
+
+@override_settings(TELEGRAM_RATE_LIMIT_ENABLED=False)
+class TelegramTransportTests(SimpleTestCase):
+
+    def test_session_is_reused_within_process(self):
+        self.assertIs(transport.get_session(), transport.get_session())
+
+    def test_send_telegram_message_uses_pooled_session(self):
+        with StubTelegramServer() as server, override_settings(
+            TELEGRAM_API_URL=server.url,
+        ):
+            send_telegram_message("first")
+            send_telegram_message("second")
+
+            self.assertEqual(server.requests_count, 2)
+
+    def test_async_sends_all_messages(self):
+        with StubTelegramServer() as server, override_settings(
+            TELEGRAM_API_URL=server.url,
+        ):
+            statuses = transport.post_messages(
+                [f"message {i}" for i in range(10)],
+                concurrency=3,
+            )
+
+            self.assertEqual(statuses, [200] * 10)
+            self.assertEqual(server.requests_count, 10)
+
+    async def test_awaitable_send_uses_shared_async_client(self):
+        with StubTelegramServer() as server, override_settings(
+            TELEGRAM_API_URL=server.url,
+        ):
+            await asend_telegram_message("first")
+            await asend_telegram_message("second")
+
+            self.assertEqual(server.requests_count, 2)
+            self.assertIs(transport.get_async_client(), transport.get_async_client())
+            await transport.get_async_client().aclose()
+
+
+@override_settings(TELEGRAM_CHAT_ID="42", TELEGRAM_RATE_LIMIT_MAX_WAIT=5)
+class TelegramRateLimitTests(SimpleTestCase):
+
+    def test_send_takes_a_token_for_the_chat(self):
+        limiter = MagicMock()
+
+        with StubTelegramServer() as server, override_settings(
+            TELEGRAM_API_URL=server.url,
+        ), patch("notifications.services.get_rate_limiter", return_value=limiter):
+            send_telegram_message("hello")
+
+        limiter.acquire.assert_called_once_with("42", max_wait=5)
+
+    def test_429_penalizes_all_senders_with_retry_after(self):
+        limiter = MagicMock()
+
+        with StubTelegramServer(
+            status=429,
+            response={"ok": False, "parameters": {"retry_after": 7}},
+        ) as server, override_settings(
+            TELEGRAM_API_URL=server.url,
+        ), patch("notifications.services.get_rate_limiter", return_value=limiter):
+            with self.assertRaises(RateLimited) as ctx:
+                send_telegram_message("hello")
+
+        self.assertEqual(ctx.exception.retry_after, 7)
+        limiter.penalize.assert_called_once_with(7)
+
+    def test_failed_send_raises(self):
+        with StubTelegramServer(status=500, response={"ok": False}) as server, override_settings(
+            TELEGRAM_API_URL=server.url,
+        ), patch("notifications.services.get_rate_limiter", return_value=None):
+            with self.assertRaises(requests.HTTPError):
+                send_telegram_message("hello")
+
+    @patch("notifications.tasks.notify_borrowing_created.apply_async")
+    @patch("notifications.tasks.deliver")
+    @patch("notifications.tasks.Borrowing.objects")
+    @patch("notifications.tasks.release_delivery")
+    @patch("notifications.tasks.claim_delivery", return_value=True)
+    def test_rate_limited_task_is_rescheduled_not_retried(
+        self,
+        mock_claim_delivery,
+        mock_release_delivery,
+        mock_borrowings,
+        mock_deliver,
+        mock_apply_async,
+    ):
+        mock_deliver.side_effect = RateLimited(3)
+
+        notify_borrowing_created(1)
+
+        mock_apply_async.assert_called_once_with((1,), {}, countdown=3)
+        mock_release_delivery.assert_called_once()
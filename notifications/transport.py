@@ -0,0 +1,113 @@
+import asyncio
+import os
+import weakref
+from collections.abc import Iterable
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from app.metrics import observe_outbound
+
+_session = None
+_session_pid = None
+
+
+def telegram_url(method: str = "sendMessage") -> str:
+    return f"{settings.TELEGRAM_API_URL}/bot{settings.TELEGRAM_BOT_TOKEN}/{method}"
+
+
+def message_payload(text: str) -> dict:
+    return {
+        "chat_id": settings.TELEGRAM_CHAT_ID,
+        "text": text,
+        "parse_mode": "HTML",
+    }
+
+
+def get_session() -> requests.Session:
+    """
+    Keep-alive session shared by every send in this worker process.
+    Re-created after a fork so pooled sockets are never shared.
+    """
+    global _session, _session_pid
+
+    if _session is None or _session_pid != os.getpid():
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=settings.TELEGRAM_POOL_MAXSIZE,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _session, _session_pid = session, os.getpid()
+
+    return _session
+
+
+def post_message(text: str) -> requests.Response:
+    with observe_outbound("telegram"):
+        return get_session().post(
+            telegram_url(),
+            json=message_payload(text),
+            timeout=settings.TELEGRAM_TIMEOUT,
+        )
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Keep-alive async client shared by every send on the running event
+    loop; httpx clients cannot be shared across loops.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+
+    if client is None:
+        client = httpx.AsyncClient(
+            timeout=settings.TELEGRAM_TIMEOUT,
+            limits=httpx.Limits(max_connections=settings.TELEGRAM_POOL_MAXSIZE),
+        )
+        _async_clients[loop] = client
+
+    return client
+
+
+async def apost_message(text: str) -> httpx.Response:
+    with observe_outbound("telegram"):
+        return await get_async_client().post(telegram_url(), json=message_payload(text))
+
+
+async def post_messages_async(
+    texts: Iterable[str],
+    *,
+    concurrency: int | None = None,
+) -> list[int]:
+    """
+    Send many messages concurrently over one pooled async client,
+    with at most `concurrency` requests in flight. Returns status codes
+    in input order.
+    """
+    concurrency = concurrency or settings.TELEGRAM_ASYNC_CONCURRENCY
+    in_flight = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(
+        max_connections=concurrency,
+        max_keepalive_connections=concurrency,
+    )
+    url = telegram_url()
+
+    async with httpx.AsyncClient(timeout=settings.TELEGRAM_TIMEOUT, limits=limits) as client:
+        async def send(text: str) -> int:
+            async with in_flight:
+                with observe_outbound("telegram"):
+                    response = await client.post(url, json=message_payload(text))
+                return response.status_code
+
+        return await asyncio.gather(*(send(text) for text in texts))
+
+
+def post_messages(texts: Iterable[str], *, concurrency: int | None = None) -> list[int]:
+    return asyncio.run(post_messages_async(texts, concurrency=concurrency))
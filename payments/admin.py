@@ -1,16 +1,26 @@
 from django.contrib import admin
-from .models import Payment
+from .models import Payment, PaymentDailySummary
 
 
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = (
         "id",
-        "borrowing",
+        "borrowing_id",
         "type",
         "status",
         "money_to_pay",
         "created_at",
     )
     list_filter = ("status", "type")
-    search_fields = ("borrowing__user__email",)
+    search_fields = ("user__email",)
+    raw_id_fields = ("borrowing", "user")
+    ordering = ("-created_at",)
+    show_full_result_count = False
+
+
+@admin.register(PaymentDailySummary)
+class PaymentDailySummaryAdmin(admin.ModelAdmin):
+    list_display = ("day", "type", "status", "payments_count", "total_amount")
+    list_filter = ("type", "status")
+    date_hierarchy = "day"
@@ -0,0 +1,23 @@
+from django.http import JsonResponse
+from rest_framework import status
+
+from app.async_api import error_response
+from .models import Payment
+from .serializers import PaymentReadSerializer
+
+
+async def payment_detail(request, user, pk):
+    """
+    Status and details of one payment, polled by clients after checkout.
+    """
+    payments = Payment.objects.all()
+
+    if not user.is_staff:
+        payments = payments.filter(user_id=user.pk)
+
+    payment = await payments.filter(pk=pk).afirst()
+
+    if payment is None:
+        return error_response("No Payment matches the given query.", status.HTTP_404_NOT_FOUND)
+
+    return JsonResponse(PaymentReadSerializer(payment).data)
@@ -0,0 +1,20 @@
+from django_filters import rest_framework as filters
+
+from .models import Payment
+
+
+class PaymentFilter(filters.FilterSet):
+    created_after = filters.IsoDateTimeFilter(
+        field_name="created_at",
+        lookup_expr="gte",
+        help_text="Only payments created at or after this moment",
+    )
+    created_before = filters.IsoDateTimeFilter(
+        field_name="created_at",
+        lookup_expr="lt",
+        help_text="Only payments created before this moment",
+    )
+
+    class Meta:
+        model = Payment
+        fields = ("status", "type")
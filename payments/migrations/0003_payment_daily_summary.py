@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_payment_expired_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentSummaryWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rebuild_from', models.DateField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PaymentDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('type', models.CharField(choices=[('PAYMENT', 'Payment'), ('FINE', 'Fine')], max_length=7)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PAID', 'Paid'), ('EXPIRED', 'Expired')], max_length=7)),
+                ('payments_count', models.PositiveIntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'ordering': ['day', 'type', 'status'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'type', 'status'), name='unique_payment_daily_summary')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 5000
+
+
+def backfill_payment_user(apps, schema_editor):
+    Payment = apps.get_model("payments", "Payment")
+    Borrowing = apps.get_model("borrowings", "Borrowing")
+
+    borrowing_user = Subquery(
+        Borrowing.objects
+        .filter(id=OuterRef("borrowing_id"))
+        .values("user_id")[:1]
+    )
+
+    last_id = 0
+    while True:
+        ids = list(
+            Payment.objects
+            .filter(id__gt=last_id, user__isnull=True)
+            .order_by("id")
+            .values_list("id", flat=True)[:BATCH_SIZE]
+        )
+
+        if not ids:
+            break
+
+        Payment.objects.filter(id__in=ids).update(user_id=borrowing_user)
+        last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own, so the table is never locked
+    # for the whole backfill.
+    atomic = False
+
+    dependencies = [
+        ('payments', '0005_payment_user'),
+        ('borrowings', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_payment_user, migrations.RunPython.noop),
+    ]
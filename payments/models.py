@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django.core.validators import MinValueValidator
 
@@ -8,6 +9,7 @@ class Payment(models.Model):
     class Status(models.TextChoices):
         PENDING = "PENDING", "Pending"
         PAID = "PAID", "Paid"
+        EXPIRED = "EXPIRED", "Expired"
 
     class Type(models.TextChoices):
         PAYMENT = "PAYMENT", "Payment"
@@ -18,6 +20,14 @@ class Payment(models.Model):
         on_delete=models.CASCADE,
         related_name="payments",
     )
+    # Denormalized from borrowing.user so per-user payment queries
+    # stay on this table; covered by the (user, status) index below.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="payments",
+        db_index=False,
+    )
 
     status = models.CharField(
         max_length=7,
@@ -40,5 +50,69 @@ class Payment(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "status"],
+                name="payment_user_status_idx",
+            ),
+            models.Index(
+                fields=["status", "created_at"],
+                name="payment_status_created_idx",
+            ),
+            models.Index(
+                fields=["type", "created_at"],
+                name="payment_type_created_idx",
+            ),
+            models.Index(
+                fields=["created_at"],
+                name="payment_created_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.user_id is None and self.borrowing_id is not None:
+            self.user_id = self.borrowing.user_id
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.type} | {self.money_to_pay} | {self.status}"
+
+
+class PaymentDailySummary(models.Model):
+    day = models.DateField()
+    type = models.CharField(
+        max_length=7,
+        choices=Payment.Type.choices,
+    )
+    status = models.CharField(
+        max_length=7,
+        choices=Payment.Status.choices,
+    )
+
+    payments_count = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+    )
+
+    class Meta:
+        ordering = ["day", "type", "status"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "type", "status"],
+                name="unique_payment_daily_summary",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} | {self.type} | {self.status} | {self.total_amount}"
+
+
+class PaymentSummaryWatermark(models.Model):
+    """
+    Oldest day whose rollups may still change. Everything before it had
+    no PENDING payments at the last refresh, so it is never recomputed.
+    """
+    rebuild_from = models.DateField()
@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PaymentCursorPagination(CursorPagination):
+    """
+    Keyset pagination over created_at: every page is an index range
+    scan, so deep pages cost the same as the first one.
+    """
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = ("-created_at", "-id")
@@ -15,3 +15,11 @@ class PaymentReadSerializer(serializers.ModelSerializer):
             "created_at",
         )
         read_only_fields = fields
+
+
+class PaymentSummarySerializer(serializers.Serializer):
+    day = serializers.DateField(required=False)
+    type = serializers.CharField(required=False)
+    status = serializers.CharField(required=False)
+    payments_count = serializers.IntegerField()
+    total_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
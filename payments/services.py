@@ -1,18 +1,24 @@
+from datetime import date, datetime, time
+
 import stripe
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils.timezone import make_aware
+
+from app.metrics import observe_outbound
+
+from .models import Payment, PaymentDailySummary
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
-def create_checkout_session(*, borrowing, amount):
-    """
-    Create Stripe Checkout Session for a borrowing payment.
-    Amount must be provided in cents.
-    """
-    session = stripe.checkout.Session.create(
-        payment_method_types=["card"],
-        mode="payment",
-        line_items=[
+def checkout_session_params(*, borrowing, amount) -> dict:
+    return {
+        "payment_method_types": ["card"],
+        "mode": "payment",
+        "line_items": [
             {
                 "price_data": {
                     "currency": "usd",
@@ -24,9 +30,55 @@ def create_checkout_session(*, borrowing, amount):
                 "quantity": 1,
             }
         ],
-        success_url=settings.STRIPE_SUCCESS_URL + "?session_id={CHECKOUT_SESSION_ID}",
-        cancel_url=settings.STRIPE_CANCEL_URL,
+        "success_url": settings.STRIPE_SUCCESS_URL + "?session_id={CHECKOUT_SESSION_ID}",
+        "cancel_url": settings.STRIPE_CANCEL_URL,
+    }
+
+
+def create_checkout_session(*, borrowing, amount):
+    """
+    Create Stripe Checkout Session for a borrowing payment.
+    Amount must be provided in cents.
+    """
+    with observe_outbound("stripe"):
+        return stripe.checkout.Session.create(
+            **checkout_session_params(borrowing=borrowing, amount=amount)
+        )
+
+
+async def acreate_checkout_session(*, borrowing, amount):
+    """
+    Awaitable create_checkout_session; Stripe is called through its
+    async (httpx) client, so no thread is held while waiting.
+    """
+    with observe_outbound("stripe"):
+        return await stripe.checkout.Session.create_async(
+            **checkout_session_params(borrowing=borrowing, amount=amount)
+        )
+
+
+def rebuild_daily_summaries(*, since: date) -> int:
+    """
+    Recompute payment rollups for every day from `since` onwards.
+    Only the created_at range is scanned, so the cost is proportional
+    to the rebuilt window, not to the whole payments table.
+    """
+    rows = (
+        Payment.objects
+        .filter(created_at__gte=make_aware(datetime.combine(since, time.min)))
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "type", "status")
+        .annotate(
+            payments_count=Count("id"),
+            total_amount=Sum("money_to_pay"),
+        )
+        .order_by()
     )
 
-    return session
+    summaries = [PaymentDailySummary(**row) for row in rows]
+
+    with transaction.atomic():
+        PaymentDailySummary.objects.filter(day__gte=since).delete()
+        PaymentDailySummary.objects.bulk_create(summaries)
 
+    return len(summaries)
@@ -0,0 +1,86 @@
+from celery import shared_task
+from django.conf import settings
+from django.db.models import Min
+from django.utils.timezone import localdate, now
+
+from .models import Payment, PaymentSummaryWatermark
+from .services import rebuild_daily_summaries
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def expire_stale_payments() -> int:
+    """
+    Move PENDING payments whose Stripe session has expired to EXPIRED.
+    Rows are updated in bounded, id-ordered batches driven by the
+    (status, created_at) index, so no single UPDATE holds locks for long.
+    """
+    cutoff = now() - settings.PAYMENT_SESSION_TTL
+    batch_size = settings.PAYMENT_EXPIRY_BATCH_SIZE
+    expired = 0
+
+    while True:
+        ids = list(
+            Payment.objects
+            .filter(
+                status=Payment.Status.PENDING,
+                created_at__lt=cutoff,
+            )
+            .order_by("status", "created_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+
+        if not ids:
+            break
+
+        expired += (
+            Payment.objects
+            .filter(id__in=ids, status=Payment.Status.PENDING)
+            .update(status=Payment.Status.EXPIRED)
+        )
+
+        if len(ids) < batch_size:
+            break
+
+    return expired
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def refresh_payment_summaries() -> int:
+    """
+    Rebuild daily payment rollups from the stored watermark. The next
+    watermark is the day of the oldest still-PENDING payment, the only
+    rows whose status (and therefore rollup bucket) can still change.
+    """
+    # Everything here runs on the primary. The pending snapshot and the
+    # aggregation must see the same rows: a replica still showing a paid
+    # payment as PENDING would freeze that day with the stale bucket once
+    # the watermark moves past it.
+    watermark = PaymentSummaryWatermark.objects.first()
+
+    if watermark:
+        since = watermark.rebuild_from
+    else:
+        first_payment = Payment.objects.aggregate(first=Min("created_at"))["first"]
+        if first_payment is None:
+            return 0
+        since = localdate(first_payment)
+
+    # Snapshot pending rows before rebuilding, so a payment that leaves
+    # PENDING mid-run is still inside the next window.
+    oldest_pending = (
+        Payment.objects
+        .filter(status=Payment.Status.PENDING)
+        .aggregate(oldest=Min("created_at"))["oldest"]
+    )
+    today = localdate()
+    rebuild_from = min(localdate(oldest_pending), today) if oldest_pending else today
+
+    rebuilt = rebuild_daily_summaries(since=since)
+
+    if watermark:
+        watermark.rebuild_from = rebuild_from
+        watermark.save(update_fields=["rebuild_from"])
+    else:
+        PaymentSummaryWatermark.objects.create(rebuild_from=rebuild_from)
+
+    return rebuilt
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from django.test import SimpleTestCase, override_settings
+
+from payments.services import acreate_checkout_session, create_checkout_session
+
+
+@override_settings(
+    STRIPE_SUCCESS_URL="https://example.com/success/",
+    STRIPE_CANCEL_URL="https://example.com/cancel/",
+)
+class CheckoutSessionTests(SimpleTestCase):
+
+    def setUp(self):
+        self.borrowing = SimpleNamespace(id=7)
+
+    @patch("stripe.checkout.Session.create")
+    def test_create_checkout_session(self, mock_create):
+        create_checkout_session(borrowing=self.borrowing, amount=1500)
+
+        params = mock_create.call_args.kwargs
+        self.assertEqual(params["line_items"][0]["price_data"]["unit_amount"], 1500)
+        self.assertEqual(
+            params["success_url"],
+            "https://example.com/success/?session_id={CHECKOUT_SESSION_ID}",
+        )
+
+    @patch("stripe.checkout.Session.create_async", new_callable=AsyncMock)
+    async def test_awaitable_checkout_session_sends_same_params(self, mock_create_async):
+        with patch("stripe.checkout.Session.create") as mock_create:
+            create_checkout_session(borrowing=self.borrowing, amount=1500)
+
+        session = await acreate_checkout_session(borrowing=self.borrowing, amount=1500)
+
+        self.assertIs(session, mock_create_async.return_value)
+        self.assertEqual(mock_create_async.call_args.kwargs, mock_create.call_args.kwargs)
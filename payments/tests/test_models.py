@@ -47,6 +47,15 @@ class PaymentModelTests(TestCase):
         self.assertIsNone(payment.session_url)
         self.assertIsNone(payment.session_id)
 
+    def test_user_is_denormalized_from_borrowing(self):
+        payment = Payment.objects.create(
+            borrowing=self.borrowing,
+            type=Payment.Type.PAYMENT,
+            money_to_pay=Decimal("12.50"),
+        )
+
+        self.assertEqual(payment.user_id, self.user.id)
+
     def test_create_fine_payment(self):
         payment = Payment.objects.create(
             borrowing=self.borrowing,
@@ -7,6 +7,7 @@ from rest_framework import status
 from users.models import User
 from books.models import Book
 from borrowings.models import Borrowing
+from notifications.models import NotificationOutbox
 from payments.models import Payment
 
 
@@ -48,7 +49,57 @@ class PaymentAPITests(APITestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_list_is_cursor_paginated(self):
+        for _ in range(3):
+            Payment.objects.create(
+                borrowing=self.borrowing,
+                type=Payment.Type.PAYMENT,
+                status=Payment.Status.PAID,
+                money_to_pay=Decimal("10.00"),
+            )
+        self.client.force_authenticate(self.user)
+
+        url = reverse("payments-list")
+        response = self.client.get(url, {"page_size": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNone(response.data["next"])
+
+    def test_list_filters_by_status_and_type(self):
+        Payment.objects.create(
+            borrowing=self.borrowing,
+            type=Payment.Type.FINE,
+            status=Payment.Status.PAID,
+            money_to_pay=Decimal("20.00"),
+        )
+        self.client.force_authenticate(self.user)
+
+        url = reverse("payments-list")
+        response = self.client.get(url, {"status": "PAID", "type": "FINE"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["type"], "FINE")
+
+    def test_list_filters_by_created_range(self):
+        self.client.force_authenticate(self.user)
+
+        url = reverse("payments-list")
+        response = self.client.get(
+            url,
+            {"created_after": "2999-01-01T00:00:00Z"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 0)
 
     def test_success_endpoint_marks_paid(self):
         url = reverse("payment-success") + "?session_id=sess_123"
@@ -63,12 +114,10 @@ class PaymentAPITests(APITestCase):
         self.payment.refresh_from_db()
         self.assertEqual(self.payment.status, Payment.Status.PAID)
 
-    @patch("payments.webhooks.notify_payment_completed.delay")
     @patch("stripe.Webhook.construct_event")
     def test_webhook_marks_paid_and_is_idempotent(
             self,
             mock_construct,
-            mock_notify,
     ):
 
         mock_construct.return_value = {
@@ -86,4 +135,5 @@ class PaymentAPITests(APITestCase):
         self.client.post(url, data="{}", content_type="application/json")
 
         self.payment.refresh_from_db()
-        self.assertEqual(self.payment.status, Payment.Status.PAID)
\ No newline at end of file
+        self.assertEqual(self.payment.status, Payment.Status.PAID)
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
@@ -0,0 +1,162 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.models import User
+from books.models import Book
+from borrowings.models import Borrowing
+from payments.models import Payment, PaymentDailySummary, PaymentSummaryWatermark
+from payments.tasks import refresh_payment_summaries
+
+
+class PaymentSummaryTests(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email="admin@test.com",
+            password="password123",
+            is_staff=True,
+        )
+        self.user = User.objects.create_user(
+            email="user@test.com",
+            password="password123"
+        )
+
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Author",
+            cover="HARD",
+            inventory=5,
+            daily_fee=Decimal("10.00"),
+        )
+
+        self.borrowing = Borrowing.objects.create(
+            user=self.user,
+            book=self.book,
+            borrow_date=date.today(),
+            expected_return_date=date.today() + timedelta(days=3),
+        )
+
+        self.url = reverse("payment-summary")
+
+    def _create_payment(self, type_, status_, amount, days_ago=0):
+        payment = Payment.objects.create(
+            borrowing=self.borrowing,
+            type=type_,
+            status=status_,
+            money_to_pay=Decimal(amount),
+        )
+        Payment.objects.filter(id=payment.id).update(
+            created_at=now() - timedelta(days=days_ago)
+        )
+        return payment
+
+    # ===============================
+    # Rollup refresh
+    # ===============================
+
+    def test_refresh_builds_rollups_and_watermark(self):
+        self._create_payment(Payment.Type.PAYMENT, Payment.Status.PAID, "10.00", days_ago=3)
+        self._create_payment(Payment.Type.PAYMENT, Payment.Status.PAID, "5.00", days_ago=3)
+        self._create_payment(Payment.Type.FINE, Payment.Status.PENDING, "20.00", days_ago=1)
+
+        refresh_payment_summaries()
+
+        self.assertEqual(PaymentDailySummary.objects.count(), 2)
+        paid = PaymentDailySummary.objects.get(status=Payment.Status.PAID)
+        self.assertEqual(paid.payments_count, 2)
+        self.assertEqual(paid.total_amount, Decimal("15.00"))
+
+        watermark = PaymentSummaryWatermark.objects.get()
+        self.assertEqual(watermark.rebuild_from, date.today() - timedelta(days=1))
+
+    def test_refresh_picks_up_status_changes_after_watermark(self):
+        pending = self._create_payment(
+            Payment.Type.FINE, Payment.Status.PENDING, "20.00", days_ago=1
+        )
+        refresh_payment_summaries()
+
+        pending.status = Payment.Status.PAID
+        pending.save(update_fields=["status"])
+        refresh_payment_summaries()
+
+        summary = PaymentDailySummary.objects.get()
+        self.assertEqual(summary.status, Payment.Status.PAID)
+
+    @patch("app.routers.replica_configured", return_value=True)
+    def test_refresh_does_not_read_a_lagging_replica(self, mock_configured):
+        # A replica is configured but has not caught up: the "replica"
+        # alias has no database in tests, so any read sent there fails
+        # instead of returning the PENDING row the primary already paid.
+        payment = self._create_payment(
+            Payment.Type.FINE, Payment.Status.PENDING, "20.00", days_ago=2
+        )
+        refresh_payment_summaries()
+
+        payment.status = Payment.Status.PAID
+        payment.save(update_fields=["status"])
+
+        refresh_payment_summaries()
+
+        summary = PaymentDailySummary.objects.get()
+        self.assertEqual(summary.status, Payment.Status.PAID)
+        self.assertEqual(PaymentSummaryWatermark.objects.get().rebuild_from, date.today())
+
+    # ===============================
+    # Endpoint
+    # ===============================
+
+    def test_summary_grouped_by_type(self):
+        self._create_payment(Payment.Type.PAYMENT, Payment.Status.PAID, "10.00", days_ago=3)
+        self._create_payment(Payment.Type.PAYMENT, Payment.Status.PAID, "5.00", days_ago=1)
+        self._create_payment(Payment.Type.FINE, Payment.Status.PAID, "20.00", days_ago=1)
+        refresh_payment_summaries()
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(self.url, {"group_by": "type"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        totals = {row["type"]: row["total_amount"] for row in response.data}
+        self.assertEqual(totals, {"FINE": "20.00", "PAYMENT": "15.00"})
+
+    def test_summary_filters_by_day_range(self):
+        self._create_payment(Payment.Type.PAYMENT, Payment.Status.PAID, "10.00", days_ago=3)
+        self._create_payment(Payment.Type.PAYMENT, Payment.Status.PAID, "5.00", days_ago=1)
+        refresh_payment_summaries()
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(
+            self.url,
+            {"from": (date.today() - timedelta(days=2)).isoformat()},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["total_amount"], "5.00")
+
+    def test_summary_rejects_invalid_group_by(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(self.url, {"group_by": "user"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_summary_rejects_impossible_dates(self):
+        self.client.force_authenticate(self.admin)
+
+        for value in ("2024-13-45", "not-a-date"):
+            with self.subTest(value=value):
+                response = self.client.get(self.url, {"from": value})
+
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.data["detail"], "Invalid date for 'from'")
+
+    def test_summary_is_admin_only(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+
+from users.models import User
+from books.models import Book
+from borrowings.models import Borrowing
+from payments.models import Payment
+from payments.tasks import expire_stale_payments
+
+
+@override_settings(
+    PAYMENT_SESSION_TTL=timedelta(hours=24),
+    PAYMENT_EXPIRY_BATCH_SIZE=2,
+)
+class ExpireStalePaymentsTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@test.com",
+            password="password123"
+        )
+
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Author",
+            cover="HARD",
+            inventory=5,
+            daily_fee=Decimal("10.00"),
+        )
+
+        self.borrowing = Borrowing.objects.create(
+            user=self.user,
+            book=self.book,
+            borrow_date=date.today(),
+            expected_return_date=date.today() + timedelta(days=3),
+        )
+
+    def _create_payment(self, status, age):
+        payment = Payment.objects.create(
+            borrowing=self.borrowing,
+            type=Payment.Type.PAYMENT,
+            status=status,
+            money_to_pay=Decimal("10.00"),
+        )
+        Payment.objects.filter(id=payment.id).update(created_at=now() - age)
+        return payment
+
+    def test_stale_pending_payments_are_expired_in_batches(self):
+        stale = [
+            self._create_payment(Payment.Status.PENDING, timedelta(hours=25))
+            for _ in range(5)
+        ]
+
+        expired = expire_stale_payments()
+
+        self.assertEqual(expired, 5)
+        for payment in stale:
+            payment.refresh_from_db()
+            self.assertEqual(payment.status, Payment.Status.EXPIRED)
+
+    def test_fresh_and_paid_payments_are_untouched(self):
+        fresh = self._create_payment(Payment.Status.PENDING, timedelta(hours=1))
+        paid = self._create_payment(Payment.Status.PAID, timedelta(hours=48))
+
+        expired = expire_stale_payments()
+
+        self.assertEqual(expired, 0)
+        fresh.refresh_from_db()
+        paid.refresh_from_db()
+        self.assertEqual(fresh.status, Payment.Status.PENDING)
+        self.assertEqual(paid.status, Payment.Status.PAID)
@@ -7,6 +7,7 @@ from django.urls import reverse
 from users.models import User
 from books.models import Book
 from borrowings.models import Borrowing
+from notifications.models import NotificationOutbox
 from payments.models import Payment
 
 
@@ -47,12 +48,10 @@ class StripeWebhookTests(TestCase):
     # SUCCESS FLOW
     # ===============================
 
-    @patch("payments.webhooks.notify_payment_completed.delay")
     @patch("stripe.Webhook.construct_event")
     def test_checkout_completed_marks_paid(
         self,
         mock_construct,
-        mock_notify,
     ):
         mock_construct.return_value = {
             "type": "checkout.session.completed",
@@ -73,18 +72,18 @@ class StripeWebhookTests(TestCase):
         self.payment.refresh_from_db()
         self.assertEqual(self.payment.status, Payment.Status.PAID)
 
-        mock_notify.assert_called_once_with(self.payment.id)
+        outbox = NotificationOutbox.objects.get()
+        self.assertEqual(outbox.event, NotificationOutbox.Event.PAYMENT_COMPLETED)
+        self.assertEqual(outbox.object_id, self.payment.id)
 
     # ===============================
     # IDEMPOTENCY
     # ===============================
 
-    @patch("payments.webhooks.notify_payment_completed.delay")
     @patch("stripe.Webhook.construct_event")
     def test_idempotent_when_already_paid(
         self,
         mock_construct,
-        mock_notify,
     ):
         self.payment.status = Payment.Status.PAID
         self.payment.save()
@@ -108,18 +107,63 @@ class StripeWebhookTests(TestCase):
         self.payment.refresh_from_db()
         self.assertEqual(self.payment.status, Payment.Status.PAID)
 
-        mock_notify.assert_not_called()
+        self.assertEqual(NotificationOutbox.objects.count(), 0)
+
+    # ===============================
+    # SESSION EXPIRED
+    # ===============================
+
+    @patch("stripe.Webhook.construct_event")
+    def test_checkout_expired_marks_expired(self, mock_construct):
+        mock_construct.return_value = {
+            "type": "checkout.session.expired",
+            "data": {
+                "object": {"id": "sess_123"}
+            }
+        }
+
+        response = self.client.post(
+            self.url,
+            data="{}",
+            content_type="application/json",
+            HTTP_STRIPE_SIGNATURE="test_sig",
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.Status.EXPIRED)
+
+    @patch("stripe.Webhook.construct_event")
+    def test_checkout_expired_does_not_touch_paid(self, mock_construct):
+        self.payment.status = Payment.Status.PAID
+        self.payment.save()
+
+        mock_construct.return_value = {
+            "type": "checkout.session.expired",
+            "data": {
+                "object": {"id": "sess_123"}
+            }
+        }
+
+        self.client.post(
+            self.url,
+            data="{}",
+            content_type="application/json",
+            HTTP_STRIPE_SIGNATURE="test_sig",
+        )
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.Status.PAID)
 
     # ===============================
     # PAYMENT NOT FOUND
     # ===============================
 
-    @patch("payments.webhooks.notify_payment_completed.delay")
     @patch("stripe.Webhook.construct_event")
     def test_checkout_completed_payment_not_found(
         self,
         mock_construct,
-        mock_notify,
     ):
         mock_construct.return_value = {
             "type": "checkout.session.completed",
@@ -136,7 +180,7 @@ class StripeWebhookTests(TestCase):
         )
 
         self.assertEqual(response.status_code, 200)
-        mock_notify.assert_not_called()
+        self.assertEqual(NotificationOutbox.objects.count(), 0)
 
     # ===============================
     # INVALID SIGNATURE
@@ -1,6 +1,11 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import PaymentsViewSet, PaymentSuccessView, PaymentCancelView
+from .views import (
+    PaymentsViewSet,
+    PaymentSuccessView,
+    PaymentCancelView,
+    PaymentSummaryView,
+)
 from .webhooks import StripeWebhookView
 
 router = DefaultRouter()
@@ -9,5 +14,6 @@ router.register("", PaymentsViewSet, basename="payments")
 urlpatterns = [
     path("success/", PaymentSuccessView.as_view(), name="payment-success"),
     path("cancel/", PaymentCancelView.as_view(), name="payment-cancel"),
+    path("summary/", PaymentSummaryView.as_view(), name="payment-summary"),
     path("webhooks/stripe/", StripeWebhookView.as_view(), name="stripe-webhook"),
 ] + router.urls
@@ -1,12 +1,19 @@
+from django.db.models import Sum
+from django.utils.dateparse import parse_date
+from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiExample, OpenApiResponse, OpenApiParameter
 from rest_framework.viewsets import ReadOnlyModelViewSet
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from .models import Payment
-from .serializers import PaymentReadSerializer
+from .filters import PaymentFilter
+from .models import Payment, PaymentDailySummary
+from .pagination import PaymentCursorPagination
+from .serializers import PaymentReadSerializer, PaymentSummarySerializer
+
+SUMMARY_GROUP_BY_FIELDS = ("day", "type", "status")
 
 
 @extend_schema_view(
@@ -17,7 +24,11 @@ from .serializers import PaymentReadSerializer
             "Permissions:\n"
             "- Authenticated users only\n"
             "- Admin users see all payments\n"
-            "- Regular users see only payments related to their borrowings\n"
+            "- Regular users see only payments related to their borrowings\n\n"
+            "Filters:\n"
+            "- status, type\n"
+            "- created_after / created_before (ISO 8601 datetime)\n\n"
+            "Results are cursor-paginated, newest first."
         ),
         responses={200: PaymentReadSerializer(many=True)},
     ),
@@ -33,18 +44,20 @@ from .serializers import PaymentReadSerializer
 class PaymentsViewSet(ReadOnlyModelViewSet):
     serializer_class = PaymentReadSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = PaymentCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = PaymentFilter
 
     def get_queryset(self):
-        queryset = Payment.objects.select_related(
-            "borrowing",
-            "borrowing__user",
-        )
+        # PaymentReadSerializer renders borrowing as a plain PK,
+        # so no related rows need to be joined in.
+        queryset = Payment.objects.all()
 
         if self.request.user.is_staff:
             return queryset
 
         return queryset.filter(
-            borrowing__user=self.request.user
+            user_id=self.request.user.pk
         )
 
 @extend_schema(
@@ -159,3 +172,91 @@ class PaymentCancelView(APIView):
             {"detail": "Payment was cancelled"},
             status=status.HTTP_200_OK,
         )
+
+
+@extend_schema(
+    summary="Payment revenue summary",
+    description=(
+        "Aggregated payment totals served from pre-computed daily rollups.\n\n"
+        "Query parameters:\n"
+        "- from / to: inclusive day range (YYYY-MM-DD)\n"
+        "- group_by: comma separated subset of day, type, status (default: day)\n\n"
+        "Rollups are refreshed periodically, so the most recent payments "
+        "may appear with a short delay.\n\n"
+        "Admin only."
+    ),
+    parameters=[
+        OpenApiParameter(
+            name="from",
+            description="First day of the range",
+            required=False,
+            type=str,
+            location=OpenApiParameter.QUERY,
+        ),
+        OpenApiParameter(
+            name="to",
+            description="Last day of the range",
+            required=False,
+            type=str,
+            location=OpenApiParameter.QUERY,
+        ),
+        OpenApiParameter(
+            name="group_by",
+            description="Grouping dimensions: day, type, status",
+            required=False,
+            type=str,
+            location=OpenApiParameter.QUERY,
+        ),
+    ],
+    responses={
+        200: PaymentSummarySerializer(many=True),
+        400: OpenApiResponse(description="Invalid query parameters"),
+    },
+)
+class PaymentSummaryView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        queryset = PaymentDailySummary.objects.all()
+
+        for param, lookup in (("from", "day__gte"), ("to", "day__lte")):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+
+            try:
+                day = parse_date(value)
+            except ValueError:
+                # Well formed but not a real date, e.g. 2024-13-45.
+                day = None
+
+            if day is None:
+                return Response(
+                    {"detail": f"Invalid date for '{param}'"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            queryset = queryset.filter(**{lookup: day})
+
+        group_by = [
+            field.strip()
+            for field in request.query_params.get("group_by", "day").split(",")
+            if field.strip()
+        ]
+
+        if not group_by or set(group_by) - set(SUMMARY_GROUP_BY_FIELDS):
+            return Response(
+                {"detail": "group_by must be a subset of: day, type, status"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows = (
+            queryset
+            .values(*group_by)
+            .annotate(
+                payments_count=Sum("payments_count"),
+                total_amount=Sum("total_amount"),
+            )
+            .order_by(*group_by)
+        )
+
+        return Response(PaymentSummarySerializer(rows, many=True).data)
@@ -5,7 +5,8 @@ from django.http import HttpResponse
 from django.views import View
 
 from .models import Payment
-from notifications.tasks import notify_payment_completed
+from notifications.models import NotificationOutbox
+from notifications.outbox import enqueue_notification
 
 
 class StripeWebhookView(View):
@@ -29,6 +30,8 @@ class StripeWebhookView(View):
     def handle_event(self, event):
         if event["type"] == "checkout.session.completed":
             self.handle_checkout_completed(event["data"]["object"])
+        elif event["type"] == "checkout.session.expired":
+            self.handle_checkout_expired(event["data"]["object"])
 
     @transaction.atomic
     def handle_checkout_completed(self, session):
@@ -49,4 +52,13 @@ class StripeWebhookView(View):
         payment.status = Payment.Status.PAID
         payment.save(update_fields=["status"])
 
-        notify_payment_completed.delay(payment.id)
+        enqueue_notification(
+            NotificationOutbox.Event.PAYMENT_COMPLETED,
+            payment.id,
+        )
+
+    def handle_checkout_expired(self, session):
+        Payment.objects.filter(
+            session_id=session.get("id"),
+            status=Payment.Status.PENDING,
+        ).update(status=Payment.Status.EXPIRED)
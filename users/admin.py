@@ -7,3 +7,10 @@ class UserAdmin(admin.ModelAdmin):
     list_display = ("email", "first_name", "last_name", "is_staff")
     search_fields = ("email",)
     ordering = ("email",)
+
+    def get_search_results(self, request, queryset, search_term):
+        # A full address is matched case-insensitively through the
+        # Lower(email) index instead of a LIKE scan.
+        if "@" in search_term and " " not in search_term.strip():
+            return queryset.filter_by_email(search_term.strip()), False
+        return super().get_search_results(request, queryset, search_term)
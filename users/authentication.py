@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import get_cached_user
+
+USER_CLAIMS = ("is_staff", "is_active")
+
+
+def set_user_claims(token, user) -> None:
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+
+
+class ClaimsTokenUser(TokenUser):
+    """
+    Token-backed user for stateless mode. Carries only the id and the
+    claims embedded at login, so it never touches the database.
+    """
+
+    @cached_property
+    def is_active(self) -> bool:
+        return self.token.get("is_active", False)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through the user
+    cache instead of a primary-key query on every request.
+
+    With JWT_STATELESS_AUTH, safe-method requests carrying user claims
+    get a ClaimsTokenUser instead, so reads skip user resolution
+    entirely. Staleness is bounded by the access token lifetime.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        if (
+            settings.JWT_STATELESS_AUTH
+            and request.method in SAFE_METHODS
+            and all(claim in validated_token for claim in USER_CLAIMS)
+        ):
+            return self.get_token_user(validated_token), validated_token
+
+        return self.get_user(validated_token), validated_token
+
+    def get_token_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        user = ClaimsTokenUser(validated_token)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+    def get_user(self, validated_token):
+        # Revocation compares against the password hash, which is
+        # deliberately not cached.
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        try:
+            user = get_cached_user(user_id)
+        except get_user_model().DoesNotExist as e:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            ) from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
@@ -0,0 +1,166 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+
+logger = logging.getLogger(__name__)
+
+# The password hash never leaves the database. Instances are rebuilt
+# with it deferred, so save() on a cached user only writes loaded fields.
+CACHED_FIELDS = (
+    "id",
+    "email",
+    "first_name",
+    "last_name",
+    "is_staff",
+    "is_active",
+    "is_superuser",
+    "date_joined",
+    "last_login",
+)
+
+_local = OrderedDict()
+_lock = threading.Lock()
+_client = None
+
+
+def _key(user_id) -> str:
+    return f"users:auth:{user_id}"
+
+
+def get_redis_client() -> redis.Redis | None:
+    global _client
+
+    if not settings.USER_CACHE_REDIS_URL:
+        return None
+
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.USER_CACHE_REDIS_URL,
+            socket_timeout=0.1,
+            socket_connect_timeout=0.1,
+        )
+
+    return _client
+
+
+def _local_get(user_id) -> dict | None:
+    with _lock:
+        entry = _local.get(user_id)
+        if entry is None:
+            return None
+
+        expires_at, values = entry
+        if expires_at < time.monotonic():
+            del _local[user_id]
+            return None
+
+        _local.move_to_end(user_id)
+        return values
+
+
+def _local_set(user_id, values: dict) -> None:
+    with _lock:
+        _local[user_id] = (time.monotonic() + settings.USER_CACHE_LOCAL_TTL, values)
+        _local.move_to_end(user_id)
+
+        while len(_local) > settings.USER_CACHE_LOCAL_SIZE:
+            _local.popitem(last=False)
+
+
+def _redis_get(user_id) -> dict | None:
+    client = get_redis_client()
+    if client is None:
+        return None
+
+    try:
+        raw = client.get(_key(user_id))
+    except redis.RedisError:
+        logger.warning("User cache read failed", exc_info=True)
+        return None
+
+    return json.loads(raw) if raw else None
+
+
+def _redis_set(user_id, values: dict) -> None:
+    client = get_redis_client()
+    if client is None:
+        return
+
+    try:
+        client.set(_key(user_id), json.dumps(values), ex=settings.USER_CACHE_TTL)
+    except redis.RedisError:
+        logger.warning("User cache write failed", exc_info=True)
+
+
+def _build_user(values: dict):
+    User = get_user_model()
+    # from_db() expects values in concrete field order. Datetimes come
+    # back from JSON as strings; let the fields parse them.
+    fields = [f for f in User._meta.concrete_fields if f.attname in values]
+    return User.from_db(
+        DEFAULT_DB_ALIAS,
+        [f.attname for f in fields],
+        [f.to_python(values[f.attname]) for f in fields],
+    )
+
+
+def get_cached_user(user_id):
+    """
+    Resolve a user by id through the process-local LRU, then Redis,
+    then the database. Raises User.DoesNotExist like objects.get().
+    """
+    # Token claims carry the id as a string, signals as an int.
+    user_id = str(user_id)
+    values = _local_get(user_id)
+
+    if values is None:
+        values = _redis_get(user_id)
+
+        if values is None:
+            User = get_user_model()
+            values = (
+                User.objects
+                .filter(id=user_id)
+                .values(*CACHED_FIELDS)
+                .first()
+            )
+            if values is None:
+                raise User.DoesNotExist
+            values = json.loads(json.dumps(values, cls=DjangoJSONEncoder))
+            _redis_set(user_id, values)
+
+        _local_set(user_id, values)
+
+    return _build_user(values)
+
+
+def invalidate_user(user_id) -> None:
+    """
+    Drop a user from both cache levels. Other processes keep their
+    local copy for at most USER_CACHE_LOCAL_TTL seconds.
+    """
+    user_id = str(user_id)
+    with _lock:
+        _local.pop(user_id, None)
+
+    client = get_redis_client()
+    if client is None:
+        return
+
+    try:
+        client.delete(_key(user_id))
+    except redis.RedisError:
+        logger.warning("User cache invalidation failed", exc_info=True)
+
+
+def clear_local_cache() -> None:
+    with _lock:
+        _local.clear()
@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+import uuid
+
+import redis
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+# Slots are members of a sorted set scored by acquisition time. Slots
+# older than the lease belong to a dead process and are dropped first.
+SEMAPHORE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local lease, limit = tonumber(ARGV[1]), tonumber(ARGV[2])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - lease)
+if redis.call('ZCARD', KEYS[1]) >= limit then
+    return 0
+end
+
+redis.call('ZADD', KEYS[1], now, ARGV[3])
+redis.call('PEXPIRE', KEYS[1], lease)
+return 1
+"""
+
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_waiting = 0
+_running = 0
+_rejected = 0
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many sign-ins in progress, try again shortly."
+    default_code = "password_hashing_busy"
+
+
+class RedisSemaphore:
+    """
+    Counting semaphore shared by every process using the same Redis,
+    so PASSWORD_HASHING_MAX_CONCURRENT caps hashing service-wide.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        *,
+        limit: int,
+        lease: float,
+        key: str = "password-hashing:slots",
+    ):
+        self.client = client
+        self.limit = limit
+        self.lease_ms = int(lease * 1000)
+        self.key = key
+        self._script = client.register_script(SEMAPHORE_SCRIPT)
+
+    def acquire(self, *, timeout: float) -> str | None:
+        """
+        Take a slot, polling for up to `timeout` seconds. Returns the
+        slot token, or None when no slot freed up in time.
+        """
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout
+
+        while True:
+            if self._script(keys=[self.key], args=[self.lease_ms, self.limit, token]):
+                return token
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.01)
+
+    def release(self, token: str) -> None:
+        self.client.zrem(self.key, token)
+
+
+class LocalSemaphore:
+    """
+    Per-process fallback when PASSWORD_HASHING_REDIS_URL is not set.
+    """
+
+    def __init__(self, *, limit: int):
+        self._semaphore = threading.BoundedSemaphore(limit) if limit > 0 else None
+
+    def acquire(self, *, timeout: float) -> str | None:
+        if self._semaphore and self._semaphore.acquire(timeout=timeout):
+            return "local"
+        return None
+
+    def release(self, token: str) -> None:
+        self._semaphore.release()
+
+
+def get_semaphore() -> RedisSemaphore | LocalSemaphore:
+    url = settings.PASSWORD_HASHING_REDIS_URL
+    limit = settings.PASSWORD_HASHING_MAX_CONCURRENT
+
+    with _semaphores_lock:
+        if (url, limit) not in _semaphores:
+            if url:
+                _semaphores[url, limit] = RedisSemaphore(
+                    redis.Redis.from_url(url),
+                    limit=limit,
+                    lease=settings.PASSWORD_HASHING_LEASE,
+                )
+            else:
+                _semaphores[url, limit] = LocalSemaphore(limit=limit)
+
+        return _semaphores[url, limit]
+
+
+def get_hashing_stats() -> dict:
+    """
+    Hashing jobs of this process: waiting for a slot, being hashed,
+    and turned away since start.
+    """
+    with _stats_lock:
+        return {
+            "queued": _waiting,
+            "running": _running,
+            "rejected": _rejected,
+        }
+
+
+def run_hashing(func, *args):
+    """
+    Run `func` once one of PASSWORD_HASHING_MAX_CONCURRENT slots is
+    free. A caller that gets no slot within PASSWORD_HASHING_MAX_WAIT
+    is rejected with PasswordHashingBusy instead of tying up a worker.
+    """
+    global _waiting, _running, _rejected
+
+    semaphore = get_semaphore()
+
+    with _stats_lock:
+        _waiting += 1
+    try:
+        token = semaphore.acquire(timeout=settings.PASSWORD_HASHING_MAX_WAIT)
+    finally:
+        with _stats_lock:
+            _waiting -= 1
+
+    if token is None:
+        with _stats_lock:
+            _rejected += 1
+        logger.warning("No password hashing slot free")
+        raise PasswordHashingBusy()
+
+    with _stats_lock:
+        _running += 1
+    try:
+        return func(*args)
+    finally:
+        semaphore.release(token)
+        with _stats_lock:
+            _running -= 1
+
+
+def hash_password(raw_password) -> str:
+    # Unusable passwords need no hashing work.
+    if raw_password is None:
+        return make_password(None)
+    return run_hashing(make_password, raw_password)
+
+
+def verify_password(raw_password, encoded) -> tuple[bool, bool]:
+    """
+    Check a password within a hashing slot. Returns (valid,
+    needs_rehash); the rehash itself is left to the caller.
+    """
+    needs_rehash = []
+
+    valid = run_hashing(
+        check_password,
+        raw_password,
+        encoded,
+        lambda raw: needs_rehash.append(True),
+    )
+
+    return valid, bool(needs_rehash)
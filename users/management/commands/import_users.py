@@ -0,0 +1,143 @@
+import csv
+import os
+import time
+from contextlib import nullcontext
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models.functions import Lower
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+User = get_user_model()
+
+
+def hash_batch(rows: list[dict], unusable: bool) -> tuple[list[dict], list[str]]:
+    """
+    Runs in pool workers. Rows without a password, or every row when
+    `unusable` is set, get an unusable password.
+    """
+    return rows, [
+        make_password(None if unusable else row.get("password") or None)
+        for row in rows
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Import users from a CSV with email, first_name, last_name and "
+        "optional password columns. Passwords are hashed on all cores "
+        "and rows are inserted in batches; existing emails are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with a header row.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Hashing processes; 1 hashes in this process.",
+        )
+        parser.add_argument(
+            "--reset-tokens",
+            metavar="PATH",
+            help=(
+                "Ignore the password column, set unusable passwords and "
+                "write email, uid and password reset token for every new "
+                "user to PATH."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        workers = options["workers"]
+        tokens_path = options["reset_tokens"]
+
+        started = time.monotonic()
+        read = created = 0
+
+        with (
+            open(options["path"], newline="", encoding="utf-8") as source,
+            open(tokens_path, "w", newline="", encoding="utf-8") if tokens_path else nullcontext() as tokens_file,
+            Pool(workers) if workers > 1 else nullcontext() as pool,
+        ):
+            rows = csv.DictReader(source)
+
+            if "email" not in (rows.fieldnames or []):
+                raise CommandError("CSV must have an email column")
+
+            batches = iter(lambda: list(islice(rows, batch_size)), [])
+            hash_rows = partial(hash_batch, unusable=bool(tokens_path))
+            # Pool.imap yields results in input order while workers hash
+            # the following batches.
+            hashed = pool.imap(hash_rows, batches) if pool else map(hash_rows, batches)
+
+            tokens = csv.writer(tokens_file) if tokens_file else None
+            if tokens:
+                tokens.writerow(("email", "uid", "token"))
+
+            for batch, passwords in hashed:
+                read += len(batch)
+                new_users = self._insert(batch, passwords)
+                created += len(new_users)
+
+                if tokens:
+                    tokens.writerows(
+                        (
+                            user.email,
+                            urlsafe_base64_encode(force_bytes(user.pk)),
+                            default_token_generator.make_token(user),
+                        )
+                        for user in new_users
+                    )
+
+                self.stdout.write(
+                    f"{read} rows, {created} created "
+                    f"({read / (time.monotonic() - started):.0f} rows/s)"
+                )
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {created} users from {read} rows "
+            f"({read - created} skipped) in {elapsed:.1f}s "
+            f"({read / elapsed:.0f} rows/s)"
+        ))
+
+    def _insert(self, batch: list[dict], passwords: list[str]) -> list:
+        """
+        Insert one batch and return the users it actually created.
+        Rows with an email that already exists are skipped.
+        """
+        users = {}
+        for row, password in zip(batch, passwords):
+            email = User.objects.normalize_email((row.get("email") or "").strip())
+            if not email or email.lower() in users:
+                continue
+            users[email.lower()] = User(
+                email=email,
+                first_name=row.get("first_name", ""),
+                last_name=row.get("last_name", ""),
+                password=password,
+            )
+
+        existing = set(
+            User.objects
+            .annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=users)
+            .values_list("email_lower", flat=True)
+        )
+
+        User.objects.bulk_create(users.values(), ignore_conflicts=True)
+
+        # ignore_conflicts leaves pk unset, so read the new rows back.
+        return list(
+            User.objects
+            .filter(email__in=[users[key].email for key in users.keys() - existing])
+            .only("id", "email", "password", "last_login")
+        )
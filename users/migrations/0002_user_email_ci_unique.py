@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:46
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_case_duplicate_emails(apps, schema_editor):
+    """
+    Stop with a list of the conflicting accounts instead of a bare
+    IntegrityError when emails differ only by case. Accounts are not
+    merged automatically: which one to keep is a decision for an admin.
+    """
+    User = apps.get_model("users", "User")
+    users = User.objects.using(schema_editor.connection.alias)
+
+    duplicates = (
+        users
+        .values(email_lower=Lower("email"))
+        .annotate(accounts=Count("id"))
+        .filter(accounts__gt=1)
+        .values_list("email_lower", flat=True)
+    )
+
+    conflicts = {}
+    for user_id, email in (
+        users
+        .annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=duplicates)
+        .order_by("email_lower", "id")
+        .values_list("id", "email")
+    ):
+        conflicts.setdefault(email.lower(), []).append(f"{email} (id {user_id})")
+
+    if conflicts:
+        lines = "\n".join(
+            f"  {', '.join(accounts)}" for accounts in conflicts.values()
+        )
+        raise RuntimeError(
+            "Cannot make user emails unique regardless of case; these "
+            f"accounts share an email:\n{lines}\n"
+            "Merge or rename them, then run migrate again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='user_email_ci_unique', violation_error_message='A user with this email already exists.'),
+        ),
+    ]
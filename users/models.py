@@ -1,9 +1,27 @@
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Lower
 
+from .hashing import hash_password, verify_password
+
+
+class UserQuerySet(models.QuerySet):
+    def filter_by_email(self, email):
+        """
+        Case-insensitive email match that can use user_email_ci_unique.
+        """
+        return (
+            self.alias(email_lower=Lower("email"))
+            .filter(email_lower=Lower(Value(email)))
+        )
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    def get_by_natural_key(self, email):
+        return self.filter_by_email(email).get()
 
-class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError("The Email must be set")
@@ -41,5 +59,32 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                Lower("email"),
+                name="user_email_ci_unique",
+                violation_error_message="A user with this email already exists.",
+            ),
+        ]
+
     def __str__(self):
         return self.email
+
+    def set_password(self, raw_password):
+        self.password = hash_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Verify within a hashing slot and transparently rehash when the
+        stored hash uses an outdated hasher or iteration count.
+        """
+        valid, needs_rehash = verify_password(raw_password, self.password)
+
+        if valid and needs_rehash:
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return valid
@@ -1,6 +1,14 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import set_user_claims
+from .cache import get_cached_user
 
 User = get_user_model()
 
@@ -11,6 +19,13 @@ class UserRegisterSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ("id", "email", "password", "first_name", "last_name")
+        # Replaces the exact-match UniqueValidator, see validate_email.
+        extra_kwargs = {"email": {"validators": []}}
+
+    def validate_email(self, value):
+        if User.objects.filter_by_email(value).exists():
+            raise serializers.ValidationError("A user with this email already exists.")
+        return value
 
     def create(self, validated_data):
         password = validated_data.pop("password")
@@ -27,3 +42,25 @@ class UserReadSerializer(serializers.ModelSerializer):
 
 class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
     username_field = "email"
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        set_user_claims(token, user)
+        return token
+
+
+class UserClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Re-stamp user claims on every refreshed access token, so they are
+    never older than ACCESS_TOKEN_LIFETIME rather than the refresh token.
+    """
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+
+        access = AccessToken(data["access"])
+        set_user_claims(access, get_cached_user(access[api_settings.USER_ID_CLAIM]))
+        data["access"] = str(access)
+
+        return data
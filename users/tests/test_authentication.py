@@ -0,0 +1,144 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.cache import clear_local_cache, get_cached_user
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        clear_local_cache()
+        self.user = User.objects.create_user(
+            email="cached@example.com",
+            password="strongpassword123",
+            first_name="Cached",
+            last_name="User",
+        )
+        self.url = reverse("users-me")
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Authorize {AccessToken.for_user(self.user)}"
+        )
+
+    def test_repeated_requests_skip_user_query(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], "cached@example.com")
+
+    def test_deactivation_invalidates_cache(self):
+        self.client.get(self.url)
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get(self.url)
+
+        self.user.delete()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(USER_CACHE_LOCAL_TTL=0)
+    def test_expired_local_entry_is_reloaded(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_saving_cached_user_keeps_password(self):
+        user = get_cached_user(self.user.id)
+        user.first_name = "Changed"
+        user.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Changed")
+        self.assertTrue(self.user.check_password("strongpassword123"))
+
+    def test_update_me_does_not_write_back_stale_cached_fields(self):
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.user.refresh_from_db()
+        self.client.get(self.url)
+
+        # update() skips the signals, so the cached copy is now stale.
+        User.objects.filter(pk=self.user.pk).update(
+            is_staff=False,
+            is_active=True,
+            email="moved@example.com",
+        )
+
+        response = self.client.patch(self.url, {"first_name": "New"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_staff)
+        self.assertEqual(self.user.email, "moved@example.com")
+
+
+@override_settings(JWT_STATELESS_AUTH=True)
+class StatelessClaimsAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="claims@example.com",
+            password="strongpassword123",
+            first_name="Claims",
+            last_name="User",
+        )
+        response = self.client.post(reverse("token-obtain"), {
+            "email": "claims@example.com",
+            "password": "strongpassword123",
+        })
+        self.refresh = response.data["refresh"]
+        self.access = AccessToken(response.data["access"])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Authorize {self.access}")
+        clear_local_cache()
+
+    def test_token_carries_user_claims(self):
+        self.assertFalse(self.access["is_staff"])
+        self.assertTrue(self.access["is_active"])
+
+    def test_read_endpoint_needs_no_user_query(self):
+        url = reverse("payments-list")
+
+        # Only the paginated payments query itself.
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_me_still_returns_profile(self):
+        response = self.client.get(reverse("users-me"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], "claims@example.com")
+
+    def test_inactive_claim_is_rejected(self):
+        token = AccessToken.for_user(self.user)
+        token["is_staff"] = False
+        token["is_active"] = False
+        self.client.credentials(HTTP_AUTHORIZATION=f"Authorize {token}")
+
+        response = self.client.get(reverse("users-me"))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_restamps_claims(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.post(reverse("token-refresh"), {"refresh": self.refresh})
+
+        self.assertTrue(AccessToken(response.data["access"])["is_staff"])
@@ -0,0 +1,167 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.hashing import PasswordHashingBusy, RedisSemaphore, get_hashing_stats, run_hashing
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+User = get_user_model()
+
+
+class PasswordHashingTests(TestCase):
+
+    def test_set_and_check_password_run_on_pool(self):
+        user = User(email="pool@example.com")
+        user.set_password("strongpassword123")
+
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+        self.assertTrue(user.check_password("strongpassword123"))
+        self.assertFalse(user.check_password("wrong"))
+        self.assertEqual(get_hashing_stats()["queued"], 0)
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        with override_settings(
+            PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+        ):
+            user = User.objects.create_user(
+                email="legacy@example.com",
+                password="strongpassword123",
+            )
+
+        self.assertTrue(user.password.startswith("md5$"))
+
+        with override_settings(PASSWORD_HASHERS=[
+            "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+        ]):
+            self.assertTrue(user.check_password("strongpassword123"))
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+
+
+class PasswordHashingBackpressureTests(APITestCase):
+
+    @override_settings(PASSWORD_HASHING_MAX_CONCURRENT=0, PASSWORD_HASHING_MAX_WAIT=0)
+    def test_full_pool_rejects_login_with_503(self):
+        rejected = get_hashing_stats()["rejected"]
+
+        response = self.client.post(reverse("token-obtain"), {
+            "email": "nobody@example.com",
+            "password": "strongpassword123",
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(get_hashing_stats()["rejected"], rejected + 1)
+
+    @override_settings(PASSWORD_HASHING_MAX_CONCURRENT=0, PASSWORD_HASHING_MAX_WAIT=0)
+    def test_full_pool_rejects_registration_with_503(self):
+        response = self.client.post(reverse("users-list"), {
+            "email": "new@example.com",
+            "password": "strongpassword123",
+            "first_name": "New",
+            "last_name": "User",
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(User.objects.exists())
+
+
+class ConcurrentHashingTests(SimpleTestCase):
+
+    def hash_concurrently(self, callers: int):
+        """
+        Start `callers` hashing jobs at once, each holding its slot for
+        a while, and return (completed, rejected, peak concurrency).
+        """
+        lock = threading.Lock()
+        running = peak = 0
+
+        def slow_hash():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.2)
+            with lock:
+                running -= 1
+            return "hash"
+
+        def call(_):
+            try:
+                return run_hashing(slow_hash)
+            except PasswordHashingBusy:
+                return None
+
+        with ThreadPoolExecutor(max_workers=callers) as pool:
+            results = list(pool.map(call, range(callers)))
+
+        return results.count("hash"), results.count(None), peak
+
+    @override_settings(
+        PASSWORD_HASHING_REDIS_URL=None,
+        PASSWORD_HASHING_MAX_CONCURRENT=2,
+        PASSWORD_HASHING_MAX_WAIT=0.05,
+    )
+    def test_concurrent_callers_beyond_the_cap_are_rejected(self):
+        completed, rejected, peak = self.hash_concurrently(6)
+
+        self.assertEqual(completed, 2)
+        self.assertEqual(rejected, 4)
+        self.assertEqual(peak, 2)
+
+    @override_settings(
+        PASSWORD_HASHING_REDIS_URL=None,
+        PASSWORD_HASHING_MAX_CONCURRENT=2,
+        PASSWORD_HASHING_MAX_WAIT=5,
+    )
+    def test_callers_within_max_wait_queue_for_a_slot(self):
+        completed, rejected, peak = self.hash_concurrently(4)
+
+        self.assertEqual(completed, 4)
+        self.assertEqual(rejected, 0)
+        self.assertEqual(peak, 2)
+
+
+@skipUnless(fakeredis, "fakeredis is not installed")
+class RedisSemaphoreTests(SimpleTestCase):
+
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        # Two clients stand in for two worker processes.
+        self.first = RedisSemaphore(fakeredis.FakeRedis(server=server), limit=2, lease=30)
+        self.second = RedisSemaphore(fakeredis.FakeRedis(server=server), limit=2, lease=30)
+
+    def test_limit_is_shared_between_processes(self):
+        first_token = self.first.acquire(timeout=0)
+        second_token = self.second.acquire(timeout=0)
+
+        self.assertIsNotNone(first_token)
+        self.assertIsNotNone(second_token)
+        self.assertIsNone(self.first.acquire(timeout=0))
+        self.assertIsNone(self.second.acquire(timeout=0))
+
+        self.first.release(first_token)
+
+        self.assertIsNotNone(self.second.acquire(timeout=0))
+
+    def test_slots_of_a_dead_process_expire(self):
+        server = fakeredis.FakeServer()
+        semaphore = RedisSemaphore(fakeredis.FakeRedis(server=server), limit=1, lease=0.05)
+
+        semaphore.acquire(timeout=0)
+        self.assertIsNone(semaphore.acquire(timeout=0))
+
+        time.sleep(0.1)
+        self.assertIsNotNone(semaphore.acquire(timeout=0))
@@ -0,0 +1,88 @@
+import csv
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils.http import urlsafe_base64_decode
+
+User = get_user_model()
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ImportUsersCommandTests(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "users.csv"
+
+    def write_csv(self, rows):
+        with self.path.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("email", "first_name", "last_name", "password"))
+            writer.writerows(rows)
+
+    def import_users(self, **options):
+        out = StringIO()
+        call_command("import_users", str(self.path), stdout=out, **options)
+        return out.getvalue()
+
+    def test_imports_in_batches_with_hashed_passwords(self):
+        self.write_csv([
+            (f"user{i}@example.com", "First", "Last", f"password{i}")
+            for i in range(25)
+        ])
+
+        output = self.import_users(batch_size=10, workers=1)
+
+        self.assertEqual(User.objects.count(), 25)
+        self.assertTrue(
+            User.objects.get(email="user7@example.com").check_password("password7")
+        )
+        self.assertIn("Imported 25 users from 25 rows", output)
+
+    def test_skips_existing_and_duplicate_emails(self):
+        User.objects.create_user(email="taken@example.com", password="x")
+        self.write_csv([
+            ("taken@example.com", "A", "B", "password"),
+            ("new@example.com", "A", "B", "password"),
+            ("new@example.com", "A", "B", "password"),
+        ])
+
+        output = self.import_users(workers=1)
+
+        self.assertEqual(User.objects.count(), 2)
+        self.assertIn("Imported 1 users from 3 rows (2 skipped)", output)
+
+    def test_hashes_in_worker_processes(self):
+        self.write_csv([
+            (f"user{i}@example.com", "First", "Last", "password")
+            for i in range(10)
+        ])
+
+        self.import_users(batch_size=3, workers=2)
+
+        self.assertEqual(User.objects.count(), 10)
+        self.assertTrue(
+            User.objects.get(email="user9@example.com").check_password("password")
+        )
+
+    def test_reset_tokens_mode_sets_unusable_passwords(self):
+        self.write_csv([("reset@example.com", "A", "B", "ignored")])
+        tokens_path = Path(self.tmp.name) / "tokens.csv"
+
+        self.import_users(workers=1, reset_tokens=str(tokens_path))
+
+        user = User.objects.get(email="reset@example.com")
+        self.assertFalse(user.has_usable_password())
+
+        with tokens_path.open(newline="") as f:
+            (row,) = csv.DictReader(f)
+
+        self.assertEqual(row["email"], "reset@example.com")
+        self.assertEqual(int(urlsafe_base64_decode(row["uid"])), user.pk)
+        self.assertTrue(default_token_generator.check_token(user, row["token"]))
@@ -1,5 +1,6 @@
-from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase
 
 
 class UserModelTests(TestCase):
@@ -17,3 +18,17 @@ class UserModelTests(TestCase):
         self.assertTrue(user.check_password("password123"))
         self.assertTrue(user.is_active)
         self.assertFalse(user.is_staff)
+
+    def test_email_is_unique_case_insensitively(self):
+        User = get_user_model()
+        User.objects.create_user(email="Case@Example.com", password="password123")
+
+        with self.assertRaises(IntegrityError):
+            User.objects.create_user(email="case@example.com", password="password123")
+
+    def test_filter_by_email_ignores_case(self):
+        User = get_user_model()
+        user = User.objects.create_user(email="Case@Example.com", password="password123")
+
+        self.assertEqual(User.objects.filter_by_email("CASE@example.COM").get(), user)
+        self.assertEqual(User.objects.get_by_natural_key("case@example.com"), user)
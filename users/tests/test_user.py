@@ -23,6 +23,19 @@ class UserRegistrationTests(APITestCase):
         self.assertEqual(User.objects.count(), 1)
         self.assertEqual(User.objects.first().email, payload["email"])
 
+    def test_registration_rejects_email_differing_only_in_case(self):
+        User.objects.create_user(email="test@example.com", password="strongpassword123")
+
+        response = self.client.post(reverse("users-list"), {
+            "email": "TEST@example.com",
+            "password": "strongpassword123",
+            "first_name": "John",
+            "last_name": "Doe",
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("email", response.data)
+
 
 class UserAuthTests(APITestCase):
     def setUp(self):
@@ -68,6 +81,14 @@ class UserAuthTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["email"], "auth@example.com")
 
+    def test_login_ignores_email_case(self):
+        response = self.client.post(reverse("token-obtain"), {
+            "email": "AUTH@Example.com",
+            "password": "strongpassword123",
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_me_requires_authentication(self):
         url = reverse("users-me")
         response = self.client.get(url)
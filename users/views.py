@@ -1,15 +1,19 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiExample, OpenApiResponse
 from rest_framework import viewsets, permissions, mixins
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework_simplejwt.models import TokenUser
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from .cache import get_cached_user
 from .serializers import (
     UserRegisterSerializer,
     UserReadSerializer,
-    EmailTokenObtainPairSerializer
+    EmailTokenObtainPairSerializer,
+    UserClaimsTokenRefreshSerializer,
 )
 
 User = get_user_model()
@@ -73,16 +77,25 @@ class UserViewSet(
     @action(methods=["get", "put", "patch"], detail=False)
     def me(self, request):
         if request.method == "GET":
-            serializer = UserReadSerializer(request.user)
+            user = request.user
+            # Stateless token users carry no profile fields.
+            if isinstance(user, TokenUser):
+                user = get_cached_user(user.pk)
+            serializer = UserReadSerializer(user)
             return Response(serializer.data)
 
-        serializer = UserReadSerializer(
-            request.user,
-            data=request.data,
-            partial=True,
-        )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
+        # request.user may be a cached copy or a token user; write through
+        # a fresh row so stale fields are never saved back.
+        with transaction.atomic():
+            user = User.objects.select_for_update().get(pk=request.user.pk)
+            serializer = UserReadSerializer(
+                user,
+                data=request.data,
+                partial=True,
+            )
+            serializer.is_valid(raise_exception=True)
+            if serializer.validated_data:
+                user = serializer.save()
         return Response(serializer.data)
 
 
@@ -150,5 +163,6 @@ class PublicEmailTokenObtainPairView(TokenObtainPairView):
     },
 )
 class PublicTokenRefreshView(TokenRefreshView):
+    serializer_class = UserClaimsTokenRefreshSerializer
     permission_classes = [AllowAny]
     authentication_classes = []